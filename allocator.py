@@ -0,0 +1,691 @@
+import time
+from array import array
+from itertools import compress
+from buddy import BuddyAllocator
+from compaction import plan_compaction
+from free_index import MaxSegmentTree, SortedFreeIndex
+from scheduler import PriorityScheduler
+from tables import BUDDY, BUDDY_OWNER, NO_OWNER, STATUSES, BlockOwners, ProcessRecord, owner_code, status_code
+
+ALGORITHMS = ("First Fit", "Best Fit", "Worst Fit", "Next Fit", "Buddy System")
+
+
+def external_fragmentation(largest_free, total_free):
+    # 0 when all free memory is one block, approaching 1 as it splinters
+    if total_free <= 0:
+        return 0.0
+    return 1 - largest_free / total_free
+
+
+class ProcessTable:
+    # Process records and change listeners, shared by the allocator models.
+    # Records are stored as typed columns (ID, Size, Priority, Status as a
+    # STATUSES code, StartTime) indexed by row, with names kept only for the
+    # processes that have one, instead of one dict per process.
+    # process_rows maps process ID -> row, so lookups and removals are O(1);
+    # rows of removed processes are reused. get_process and process_list
+    # hand out ProcessRecord views of the rows.
+    #
+    # Processes are listed highest priority first (earliest arrival first
+    # among equals) by a PriorityScheduler heap, so the table never has to
+    # be re-sorted. Aging is lazy: the Priority column holds each priority
+    # minus aging_offset, and age() only raises the offset, which moves
+    # every process up at once without changing their order.
+    #
+    # For searches, names are also kept lowercased in a sorted (name, ID)
+    # index for prefix lookups, and each status has its own heap of the
+    # processes in it, in the same order as the main one.
+    def __init__(self):
+        self.clear_processes()
+        self.next_process_id = 1
+        self.listeners = []
+
+    @property
+    def process_list(self):
+        rows = self.process_rows
+        return [ProcessRecord(self, rows[process_id]) for process_id in self.scheduler]
+
+    @process_list.setter
+    def process_list(self, processes):
+        self.replace_processes(processes)
+
+    def replace_processes(self, processes, arrivals=None):
+        # Replaces the whole table from records or plain dicts, e.g. loaded
+        # from JSON. arrivals, if given, are the processes' arrival numbers
+        # from arrival_numbers(), so equal priorities keep their order;
+        # otherwise they arrive in the order listed.
+        records = [(proc["ID"], proc["Size"], proc["Priority"], status_code(proc.get("Status", "Running")),
+                    proc.get("StartTime", time.time()), proc.get("Name")) for proc in processes]
+        arrivals = list(arrivals) if arrivals is not None else [None] * len(records)
+        if len(arrivals) != len(records):
+            raise ValueError("Need one arrival number per process")
+        self.clear_processes()
+        self.notify("record", ("clear",))
+        for record, arrival in zip(records, arrivals):
+            self.add_row(*record, arrival=arrival)
+        self.notify("processes")
+
+    def arrival_numbers(self):
+        # Arrival number of every process, in display order
+        return [self.scheduler.key_of(process_id)[1] for process_id in self.scheduler]
+
+    def clear_processes(self):
+        self.process_rows = {}
+        self.free_rows = []
+        self.ids = array("q")
+        self.sizes = array("q")
+        self.priorities = array("q")
+        self.statuses = array("b")
+        self.start_times = array("d")
+        self.names = {}  # row -> name
+        self.scheduler = PriorityScheduler()
+        self.aging_offset = 0
+        self.arrivals = 0  # Tie-breaker for equal priorities
+        self.name_index = SortedFreeIndex()  # (lowercased name, process ID)
+        self.status_queues = [PriorityScheduler() for _ in STATUSES]
+
+    def subscribe(self, listener):
+        # listener(event, index) is called with the model's change event and
+        # where it happened ("block" and a block index for Allocator), or with
+        # "processes" and None when the process table changes. Each table
+        # change also comes as "record" with the change itself, e.g.
+        # ("status", process ID, status), for the journal to write down
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def notify(self, event, index=None):
+        for listener in self.listeners:
+            listener(event, index)
+
+    def check_process_id(self, process_id):
+        if process_id is None:
+            return
+        if process_id <= 0:
+            raise ValueError("Process IDs must be positive")
+        if process_id in self.process_rows:
+            raise ValueError(f"Process ID {process_id} is already in use")
+
+    def add_row(self, process_id, size, priority, status, start_time, name=None, arrival=None):
+        # arrival orders equal priorities; by default the process arrives
+        # after every other
+        self.check_process_id(process_id)
+        priority -= self.aging_offset
+        # Every value is converted to its column type before any column
+        # changes, so one the columns cannot hold (e.g. a priority beyond 64
+        # bits) raises with the columns still aligned
+        array("q", (process_id, size, priority))
+        array("b", (status,))
+        array("d", (start_time,))
+        if name is not None and not isinstance(name, str):
+            raise TypeError("Process names must be strings")
+        if arrival is None:
+            arrival = self.arrivals
+        elif not isinstance(arrival, int) or arrival < 0:
+            raise ValueError("Arrival numbers must be non-negative integers")
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.ids[row] = process_id
+            self.sizes[row] = size
+            self.priorities[row] = priority
+            self.statuses[row] = status
+            self.start_times[row] = start_time
+        else:
+            row = len(self.ids)
+            self.ids.append(process_id)
+            self.sizes.append(size)
+            self.priorities.append(priority)
+            self.statuses.append(status)
+            self.start_times.append(start_time)
+        self.process_rows[process_id] = row
+        # However the process got here (allocated, loaded, replayed), later
+        # IDs handed out must not collide with it
+        self.next_process_id = max(self.next_process_id, process_id + 1)
+        key = (-priority, arrival)
+        self.arrivals = max(self.arrivals, arrival + 1)
+        self.scheduler.push(process_id, key)
+        self.status_queues[status].push(process_id, key)
+        if name is not None:
+            self.names[row] = name
+            self.name_index.add(name.lower(), process_id)
+        self.notify("record", ("add", process_id, size, priority + self.aging_offset, STATUSES[status], start_time, name,
+                               arrival))
+        return row
+
+    def add_process(self, process_size, priority, name=None, process_id=None):
+        # IDs are handed out in sequence unless the caller supplies one
+        if process_id is None:
+            process_id = self.next_process_id
+        self.add_row(process_id, process_size, priority, status_code("Running"), time.time(), name)
+        return process_id
+
+    def remove_process(self, process_id):
+        row = self.process_rows.pop(process_id)
+        name = self.names.pop(row, None)
+        if name is not None:
+            self.name_index.remove(name.lower(), process_id)
+        self.status_queues[self.statuses[row]].remove(process_id)
+        self.free_rows.append(row)
+        self.scheduler.remove(process_id)
+        self.notify("record", ("remove", process_id))
+
+    def get_process(self, process_id):
+        row = self.process_rows.get(process_id)
+        return ProcessRecord(self, row) if row is not None else None
+
+    def process_column(self, key):
+        # One record field for every process, in display order, without
+        # building a record per process
+        rows = [self.process_rows[process_id] for process_id in self.scheduler]
+        if key == "Priority":
+            return [self.priorities[row] + self.aging_offset for row in rows]
+        column = {"ID": self.ids, "Size": self.sizes, "StartTime": self.start_times}.get(key)
+        if column is not None:
+            return [column[row] for row in rows]
+        if key == "Status":
+            return [STATUSES[self.statuses[row]] for row in rows]
+        if key == "Name":
+            return [self.names.get(row) for row in rows]
+        raise KeyError(key)
+
+    def set_status(self, process_id, status, expected=None):
+        # Changes a process status; with expected set, only from that status
+        row = self.process_rows.get(process_id)
+        if row is None or (expected is not None and self.statuses[row] != status_code(expected)):
+            return False
+        code = status_code(status)
+        if code != self.statuses[row]:
+            self.status_queues[self.statuses[row]].remove(process_id)
+            self.status_queues[code].push(process_id, self.scheduler.key_of(process_id))
+            self.statuses[row] = code
+        self.notify("record", ("status", process_id, STATUSES[code]))
+        self.notify("processes")
+        return True
+
+    def suspend(self, process_id):
+        return self.set_status(process_id, "Suspended", expected="Running")
+
+    def resume(self, process_id):
+        return self.set_status(process_id, "Running", expected="Suspended")
+
+    def rename(self, process_id, new_name):
+        if not isinstance(new_name, str):
+            raise TypeError("Process names must be strings")
+        row = self.process_rows.get(process_id)
+        if row is None:
+            return False
+        old_name = self.names.get(row)
+        if old_name is not None:
+            self.name_index.remove(old_name.lower(), process_id)
+        self.names[row] = new_name
+        self.name_index.add(new_name.lower(), process_id)
+        self.notify("record", ("rename", process_id, new_name))
+        self.notify("processes")
+        return True
+
+    def with_name_prefix(self, prefix):
+        # IDs of the processes whose name starts with prefix (any case)
+        prefix = prefix.lower()
+        found = []
+        for name, process_id in self.name_index.iter_from((prefix, -1)):
+            if not name.startswith(prefix):
+                break
+            found.append(process_id)
+        return found
+
+    def find_processes(self, process_id=None, name_prefix=None, status=None, min_priority=None, max_priority=None):
+        # IDs of the processes matching every given condition. Candidates
+        # come from the narrowest index that applies: the ID, the name index,
+        # or else the heap of the status (or of all processes) walked in
+        # priority order only down to min_priority. The other conditions are
+        # checked on those candidates.
+        if process_id is not None:
+            candidates = [process_id] if process_id in self.process_rows else []
+        elif name_prefix is not None:
+            candidates = self.with_name_prefix(name_prefix)
+        else:
+            queue = self.status_queues[status_code(status)] if status is not None else self.scheduler
+            candidates = self.by_priority(queue, min_priority)
+
+        code = status_code(status) if status is not None else None
+        found = []
+        for candidate in candidates:
+            row = self.process_rows.get(candidate)
+            if row is None:
+                continue
+            if name_prefix is not None and not self.names.get(row, "").lower().startswith(name_prefix.lower()):
+                continue
+            if code is not None and self.statuses[row] != code:
+                continue
+            priority = self.priorities[row] + self.aging_offset
+            if (min_priority is not None and priority < min_priority) or (max_priority is not None and priority > max_priority):
+                continue
+            found.append(candidate)
+        return found
+
+    def by_priority(self, queue, min_priority=None):
+        # Process IDs from a scheduler heap, highest priority first, stopping
+        # below min_priority
+        for process_id in queue:
+            if min_priority is not None and self.priority_of(process_id) < min_priority:
+                return
+            yield process_id
+
+    def search_processes(self, query):
+        # What the search boxes match: the process with that ID, and every
+        # process whose name starts with the query; all processes if empty
+        query = query.strip()
+        if not query:
+            return list(self.scheduler)
+        found = self.find_processes(process_id=int(query)) if query.isdigit() else []
+        return found + [process_id for process_id in self.with_name_prefix(query) if process_id not in found]
+
+    def priority_of(self, process_id):
+        return self.priorities[self.process_rows[process_id]] + self.aging_offset
+
+    def set_priority(self, process_id, priority):
+        row = self.process_rows.get(process_id)
+        if row is None:
+            return False
+        self.priorities[row] = priority - self.aging_offset
+        key = (-self.priorities[row], self.scheduler.key_of(process_id)[1])
+        self.scheduler.change_key(process_id, key)
+        self.status_queues[self.statuses[row]].change_key(process_id, key)
+        self.notify("record", ("priority", process_id, priority))
+        self.notify("processes")
+        return True
+
+    def highest_priority(self):
+        # Process ID with the highest priority, or None
+        return self.scheduler.peek()
+
+    def age(self, amount=1):
+        # Raises every process's priority by amount in O(1)
+        self.aging_offset += amount
+        self.notify("record", ("age", amount))
+        self.notify("processes")
+
+
+class Allocator(ProcessTable):
+    # Headless memory allocator: owns the blocks and the process table and
+    # reports every change to its listeners, so a GUI can watch it without
+    # being needed to drive it. Listeners get "block" with the index of a
+    # changed block, or "layout" when compaction has merged blocks and
+    # every index from the compacted run on may have changed.
+    #
+    # With indexed=True (the default) free blocks are also kept in a sorted
+    # index so Best Fit and Worst Fit are lookups instead of full scans, and
+    # in a max segment tree over block positions so First Fit can descend to
+    # the leftmost block that fits; indexed=False keeps the plain linear scans.
+    def __init__(self, memory_blocks, indexed=True):
+        super().__init__()
+        # Block columns: free or remaining size, original size, and owner
+        # (a process ID, NO_OWNER or BUDDY_OWNER)
+        self.memory_blocks = array("q", memory_blocks)
+        self.original_memory = array("q", self.memory_blocks)
+        self.owners = array("q", [NO_OWNER]) * len(self.memory_blocks)
+
+        # Next Fit resumes its search where the previous allocation stopped
+        self.next_fit_position = 0
+
+        # Process ID -> block index, for plain blocks and buddy arenas alike
+        self.process_blocks = {}
+
+        # Buddy System: block index -> BuddyAllocator
+        self.buddy_arenas = {}
+
+        # Running totals, so statistics never have to walk the blocks
+        self.total_units = sum(self.original_memory)
+        self.free_units = self.total_units
+
+        self.indexed = indexed
+        self.build_indexes()
+
+    def build_indexes(self):
+        if not self.indexed:
+            self.free_index = self.first_fit_tree = self.buddy_tree = None
+            return
+        n = len(self.memory_blocks)
+        owners = self.owners
+        self.free_index = SortedFreeIndex((self.memory_blocks[i], i) for i in range(n) if owners[i] == NO_OWNER)
+        self.first_fit_tree = MaxSegmentTree([self.memory_blocks[i] if owners[i] == NO_OWNER else -1 for i in range(n)])
+        # Largest free chunk of each buddy arena by block position, -1 elsewhere
+        self.buddy_tree = MaxSegmentTree([self.buddy_arenas[i].largest_free() if owners[i] == BUDDY_OWNER else -1 for i in range(n)])
+
+    def reindex_from(self, first, old_free):
+        # Brings the indexes up to date after every block from first on was
+        # renumbered (by compaction); blocks before first keep their entries.
+        # old_free lists the (size, index) entries the free index held there.
+        if not self.indexed:
+            return
+        n = len(self.memory_blocks)
+        owners = self.owners
+        self.free_index.replace(old_free, [(self.memory_blocks[i], i) for i in range(first, n) if owners[i] == NO_OWNER])
+        self.first_fit_tree.assign(first, [self.memory_blocks[i] if owners[i] == NO_OWNER else -1 for i in range(first, n)])
+        self.buddy_tree.assign(first, [self.buddy_arenas[i].largest_free() if owners[i] == BUDDY_OWNER else -1
+                                       for i in range(first, n)])
+
+    @property
+    def processes(self):
+        # Owner of each block: None when free, BUDDY for a buddy arena, else
+        # the process ID
+        return BlockOwners(self.owners)
+
+    def set_block(self, index, size, process_id):
+        # Every change to a block goes through here so the indexes stay in
+        # step. process_id is None for a free block or BUDDY for an arena.
+        owner = owner_code(process_id)
+        previous = self.owners[index]
+        if self.indexed:
+            if previous == NO_OWNER:
+                self.free_index.remove(self.memory_blocks[index], index)
+            if owner == NO_OWNER:
+                self.free_index.add(size, index)
+            self.first_fit_tree.update(index, size if owner == NO_OWNER else -1)
+            self.buddy_tree.update(index, self.buddy_arenas[index].largest_free() if owner == BUDDY_OWNER else -1)
+        # Free blocks and arenas count towards free memory, process blocks not
+        if previous <= NO_OWNER:
+            self.free_units -= self.memory_blocks[index]
+        if owner <= NO_OWNER:
+            self.free_units += size
+        if previous > 0 and self.process_blocks.get(previous) == index:
+            del self.process_blocks[previous]
+        if owner > 0:
+            self.process_blocks[owner] = index
+        self.memory_blocks[index] = size
+        self.owners[index] = owner
+        self.notify("block", index)
+
+    # Placement searches return the chosen block index, or -1 when nothing fits
+
+    def first_fit(self, process_size):
+        if self.indexed:
+            return self.first_fit_tree.leftmost(process_size)
+
+        for i, block_size in enumerate(self.memory_blocks):
+            if block_size >= process_size and self.owners[i] == NO_OWNER:
+                return i
+        return -1
+
+    def best_fit(self, process_size):
+        if self.indexed:
+            # Smallest free block that is large enough
+            entry = self.free_index.ceiling(process_size)
+            return entry[1] if entry is not None else -1
+
+        best_block = -1
+        best_size = float('inf')
+        for i, block_size in enumerate(self.memory_blocks):
+            if block_size >= process_size and block_size < best_size and self.owners[i] == NO_OWNER:
+                best_block = i
+                best_size = block_size
+        return best_block
+
+    def worst_fit(self, process_size):
+        if self.indexed:
+            entry = self.free_index.largest()
+            return entry[1] if entry is not None and entry[0] >= process_size else -1
+
+        worst_block = -1
+        worst_size = float('-inf')
+        for i, block_size in enumerate(self.memory_blocks):
+            if block_size >= process_size and block_size > worst_size and self.owners[i] == NO_OWNER:
+                worst_block = i
+                worst_size = block_size
+        return worst_block
+
+    def next_fit(self, process_size):
+        start = self.next_fit_position
+        if self.indexed:
+            index = self.first_fit_tree.leftmost(process_size, start)
+            return index if index != -1 else self.first_fit_tree.leftmost(process_size)
+
+        n = len(self.memory_blocks)
+        for k in range(n):
+            i = (start + k) % n
+            if self.memory_blocks[i] >= process_size and self.owners[i] == NO_OWNER:
+                return i
+        return -1
+
+    def buddy_fit(self, process_size):
+        # The lowest existing arena with room, else the first free block big
+        # enough to hold the request rounded up to a power of two
+        chunk_size = 1 << BuddyAllocator.order_for(process_size)
+        if self.indexed:
+            index = self.buddy_tree.leftmost(chunk_size)
+        else:
+            index = min((i for i, arena in self.buddy_arenas.items() if arena.can_allocate(process_size)), default=-1)
+        return index if index != -1 else self.first_fit(chunk_size)
+
+    def find_block(self, process_size, algorithm="First Fit"):
+        if algorithm == "First Fit":
+            return self.first_fit(process_size)
+        elif algorithm == "Best Fit":
+            return self.best_fit(process_size)
+        elif algorithm == "Worst Fit":
+            return self.worst_fit(process_size)
+        elif algorithm == "Next Fit":
+            return self.next_fit(process_size)
+        elif algorithm == "Buddy System":
+            return self.buddy_fit(process_size)
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    def allocate(self, process_size, priority=1, algorithm="First Fit", name=None, process_id=None):
+        # Returns the process ID, or None when no block can hold the process
+        if process_size <= 0:
+            raise ValueError("Process size must be positive")
+        self.check_process_id(process_id)
+        index = self.find_block(process_size, algorithm)
+        if index == -1:
+            return None
+
+        process_id = self.add_process(process_size, priority, name, process_id)
+        self.take_block(index, process_id, process_size, algorithm)
+        self.notify("processes")
+        return process_id
+
+    def take_block(self, index, process_id, process_size, algorithm):
+        if algorithm == "Buddy System":
+            arena = self.buddy_arenas.get(index)
+            if arena is None:
+                arena = self.buddy_arenas[index] = BuddyAllocator(self.original_memory[index])
+            arena.allocate(process_size, process_id)
+            self.process_blocks[process_id] = index
+            self.set_block(index, arena.free_memory(), BUDDY)
+        else:
+            if algorithm == "Next Fit":
+                self.next_fit_position = (index + 1) % len(self.memory_blocks)
+            self.set_block(index, self.memory_blocks[index] - process_size, process_id)
+
+    def place(self, process_id, algorithm="First Fit"):
+        # Finds memory again for a process that is in the table but holds
+        # none, e.g. one swapped out; False when nothing fits
+        process = self.get_process(process_id)
+        if process is None or self.holds_memory(process_id):
+            return False
+        index = self.find_block(process.size, algorithm)
+        if index == -1:
+            return False
+        self.take_block(index, process_id, process.size, algorithm)
+        self.notify("processes")
+        return True
+
+    def allocate_many(self, process_sizes, priority=1, algorithm="First Fit"):
+        # One allocation per size, in order; failed entries come back as None.
+        # Sizes are checked first so a bad one allocates nothing at all.
+        process_sizes = list(process_sizes)
+        if any(size <= 0 for size in process_sizes):
+            raise ValueError("Process size must be positive")
+        return [self.allocate(size, priority, algorithm) for size in process_sizes]
+
+    def restore(self, processes, arenas=None, next_fit_position=0):
+        # Puts processes straight back into the blocks they held, e.g. from
+        # saved state, into a fresh allocator. processes are dicts with the
+        # record keys plus "Block", in display order; arenas maps block
+        # index -> BuddyAllocator already holding its processes.
+        if self.process_rows or self.buddy_arenas:
+            raise ValueError("Can only restore into an empty allocator")
+        for index, arena in (arenas or {}).items():
+            if arena.capacity != self.original_memory[index]:
+                raise ValueError(f"Buddy arena does not match block {index + 1}")
+            self.buddy_arenas[index] = arena
+            self.set_block(index, arena.free_memory(), BUDDY)
+        for proc in processes:
+            index, size = proc["Block"], proc["Size"]
+            buddy = self.owners[index] == BUDDY_OWNER
+            if buddy and proc["ID"] not in self.buddy_arenas[index].allocations:
+                raise ValueError(f"P{proc['ID']} is not in the buddy arena of block {index + 1}")
+            if not buddy and (self.owners[index] != NO_OWNER or self.memory_blocks[index] < size):
+                raise ValueError(f"Block {index + 1} cannot hold P{proc['ID']}")
+            process_id = self.add_process(size, proc["Priority"], proc.get("Name"), proc["ID"])
+            if buddy:
+                self.process_blocks[process_id] = index
+            else:
+                self.set_block(index, self.memory_blocks[index] - size, process_id)
+        self.next_fit_position = next_fit_position
+        self.notify("processes")
+
+    def release(self, process_id):
+        # Frees the memory a process holds but keeps it in the table
+        i = self.process_blocks.get(process_id)
+        if i is None:
+            return False
+
+        if self.owners[i] == BUDDY_OWNER:
+            del self.process_blocks[process_id]
+            arena = self.buddy_arenas[i]
+            arena.free(process_id)
+            if arena.allocations:
+                self.set_block(i, arena.free_memory(), BUDDY)
+            else:
+                # Last process gone: the block goes back to being a plain block
+                del self.buddy_arenas[i]
+                self.set_block(i, self.original_memory[i], None)
+        else:
+            self.set_block(i, self.original_memory[i], None)  # Restores original block size
+        return True
+
+    def deallocate(self, process_id):
+        if not self.release(process_id):
+            return False
+        self.remove_process(process_id)
+        self.notify("processes")
+        return True
+
+    def defragment(self, process_size=None):
+        # Compacts memory by sliding allocated blocks (buddy arenas included)
+        # together and merging the free blocks between them into one block,
+        # in a single pass over the blocks. Without process_size everything
+        # from the first free block on is compacted, leaving one free block
+        # at the end; with process_size only the cheapest run of blocks that
+        # yields a free block of that size is compacted, and nothing at all
+        # if such a block already exists.
+        #
+        # Returns {"Moved": KB copied, "Relocations": blocks moved,
+        # "Satisfied": whether a large enough free block now exists}.
+        n = len(self.memory_blocks)
+        if process_size is not None and self.best_fit(process_size) != -1:
+            return {"Moved": 0, "Relocations": 0, "Satisfied": True}
+
+        # A window always starts on a free block, so nothing before the
+        # first one needs looking at
+        start = self.first_fit(0)
+        if start == -1:
+            return {"Moved": 0, "Relocations": 0, "Satisfied": process_size is None}
+        is_free = [self.owners[i] == NO_OWNER for i in range(start, n)]
+        used = [0 if is_free[i - start] else self.original_memory[i] - self.memory_blocks[i] for i in range(start, n)]
+        plan = plan_compaction(is_free, self.memory_blocks[start:], used, process_size)
+        if plan is None:
+            return {"Moved": 0, "Relocations": 0, "Satisfied": process_size is None}
+        first, last = plan[0] + start, plan[1] + start
+        old_free = [(self.memory_blocks[i], i) for i in compress(range(first, n), is_free[first - start:])]
+
+        window_blocks, window_original, window_owners, window_arenas = array("q"), array("q"), array("q"), []
+        free_total = 0
+        moved = relocations = 0
+        for i in range(first, last + 1):
+            if is_free[i - start]:
+                free_total += self.memory_blocks[i]
+            else:
+                if free_total:
+                    moved += used[i - start]
+                    relocations += 1
+                window_blocks.append(self.memory_blocks[i])
+                window_original.append(self.original_memory[i])
+                window_owners.append(self.owners[i])
+                window_arenas.append(self.buddy_arenas.get(i))
+        if free_total:
+            window_blocks.append(free_total)
+            window_original.append(free_total)
+            window_owners.append(NO_OWNER)
+            window_arenas.append(None)
+
+        # Everything from the window on may now sit at a different index
+        tail_arenas = window_arenas + [self.buddy_arenas.get(i) for i in range(last + 1, n)]
+        self.buddy_arenas = {i: arena for i, arena in self.buddy_arenas.items() if i < first}
+        self.memory_blocks[first:last+1] = window_blocks
+        self.original_memory[first:last+1] = window_original
+        self.owners[first:last+1] = window_owners
+        for i, arena in enumerate(tail_arenas, first):
+            if arena is not None:
+                self.buddy_arenas[i] = arena
+                for process_id in arena.allocations:
+                    self.process_blocks[process_id] = i
+            elif self.owners[i] > 0:
+                self.process_blocks[self.owners[i]] = i
+
+        shift = (last + 1 - first) - len(window_blocks)
+        if self.next_fit_position > last:
+            self.next_fit_position -= shift
+        elif self.next_fit_position > first:
+            self.next_fit_position = first
+        self.reindex_from(first, old_free)
+        self.notify("layout")
+        return {"Moved": moved, "Relocations": relocations, "Satisfied": True}
+
+    def block_of(self, process_id):
+        return self.process_blocks.get(process_id, -1)
+
+    def holds_memory(self, process_id):
+        # False for a process in the table without a block, e.g. one restored
+        # from saved state
+        return process_id in self.process_blocks
+
+    def room_if_freed(self, process_id):
+        # Largest free block deallocating the process would leave, at least
+        # (a buddy chunk may merge further with its free buddies)
+        i = self.process_blocks[process_id]
+        if self.owners[i] != BUDDY_OWNER:
+            return self.original_memory[i]
+        arena = self.buddy_arenas[i]
+        if len(arena.allocations) == 1:
+            return self.original_memory[i]
+        return max(arena.largest_free(), arena.chunk_of(process_id)[1])
+
+    def total_memory(self):
+        return self.total_units
+
+    def free_memory(self):
+        # Free blocks plus the unallocated part of every buddy arena
+        return self.free_units
+
+    def used_memory(self):
+        return self.total_units - self.free_units
+
+    def largest_free_block(self):
+        # Largest single free block or free buddy chunk
+        if self.indexed:
+            entry = self.free_index.largest()
+            return max(entry[0] if entry is not None else 0, self.buddy_tree.tree[1], 0)
+        largest = max((self.memory_blocks[i] for i in range(len(self.memory_blocks)) if self.owners[i] == NO_OWNER), default=0)
+        return max([largest] + [arena.largest_free() for arena in self.buddy_arenas.values()])
+
+    def external_fragmentation(self):
+        return external_fragmentation(self.largest_free_block(), self.free_units)
+
+    def statistics(self):
+        largest_free = self.largest_free_block()
+        return {"Total": self.total_units, "Used": self.used_memory(), "Free": self.free_units,
+                "Largest Free": largest_free,
+                "External Fragmentation": external_fragmentation(largest_free, self.free_units)}
@@ -0,0 +1,231 @@
+import argparse
+import itertools
+import random
+import sys
+import threading
+import time
+
+from allocator import ALGORITHMS, Allocator, external_fragmentation
+
+
+class Arena:
+    # One slice of memory: its own Allocator and the lock that guards it
+    __slots__ = ("allocator", "lock", "contended")
+
+    def __init__(self, memory_blocks):
+        self.allocator = Allocator(memory_blocks)
+        self.lock = threading.Lock()
+        self.contended = 0  # Acquisitions that found the lock held
+
+    def acquire(self):
+        if not self.lock.acquire(blocking=False):
+            self.contended += 1
+            self.lock.acquire()
+
+
+class ConcurrentAllocator:
+    # Allocator for many threads: the blocks are dealt out round robin into
+    # arena_count arenas, each an Allocator with its own lock, so threads
+    # working in different arenas never wait for each other. Each thread is
+    # given a preferred arena the first time it allocates (round robin over
+    # threads) and only moves on to the other arenas, in order, when the
+    # preferred one cannot hold the process. Process IDs are unique across
+    # arenas.
+    #
+    # Each operation holds exactly one arena lock at a time, so arenas cannot
+    # deadlock. A process stays in the arena that allocated it; the process
+    # to arena map is shared, relying on single dict operations being atomic.
+    def __init__(self, memory_blocks, arena_count=4):
+        if not memory_blocks:
+            raise ValueError("At least one memory block is needed")
+        if arena_count <= 0:
+            raise ValueError("Arena count must be positive")
+        arena_count = min(arena_count, len(memory_blocks))
+        self.arenas = [Arena(memory_blocks[i::arena_count]) for i in range(arena_count)]
+        self.process_arenas = {}  # process ID -> arena index
+        self.ids = itertools.count(1)
+        self.id_lock = threading.Lock()
+        self.local = threading.local()
+        self.next_arena = itertools.count()
+
+    def preferred_arena(self):
+        index = getattr(self.local, "arena", None)
+        if index is None:
+            index = self.local.arena = next(self.next_arena) % len(self.arenas)
+        return index
+
+    def new_process_id(self):
+        with self.id_lock:
+            return next(self.ids)
+
+    def allocate(self, process_size, priority=1, algorithm="First Fit", name=None):
+        # Returns the process ID, or None when no arena can hold the process
+        if process_size <= 0:
+            raise ValueError("Process size must be positive")
+        process_id = self.new_process_id()
+        preferred = self.preferred_arena()
+        count = len(self.arenas)
+        for step in range(count):
+            index = (preferred + step) % count
+            arena = self.arenas[index]
+            arena.acquire()
+            try:
+                allocated = arena.allocator.allocate(process_size, priority, algorithm, name, process_id)
+                if allocated is not None:
+                    # Recorded under the arena lock so a free of this ID from
+                    # another thread finds it
+                    self.process_arenas[process_id] = index
+                    return process_id
+            finally:
+                arena.lock.release()
+        return None
+
+    def deallocate(self, process_id):
+        index = self.process_arenas.get(process_id)
+        if index is None:
+            return False
+        arena = self.arenas[index]
+        arena.acquire()
+        try:
+            # Another thread may have freed it since the lookup
+            if not arena.allocator.deallocate(process_id):
+                return False
+            del self.process_arenas[process_id]
+            return True
+        finally:
+            arena.lock.release()
+
+    def get_process(self, process_id):
+        index = self.process_arenas.get(process_id)
+        if index is None:
+            return None
+        arena = self.arenas[index]
+        with arena.lock:
+            process = arena.allocator.get_process(process_id)
+            return process.as_dict() if process is not None else None
+
+    def statistics(self):
+        # Each arena is read under its own lock, so the totals are consistent
+        # per arena but not a single snapshot across arenas
+        totals = {"Total": 0, "Used": 0, "Free": 0, "Largest Free": 0, "Processes": 0, "Contended": 0}
+        for arena in self.arenas:
+            with arena.lock:
+                stats = arena.allocator.statistics()
+                totals["Processes"] += len(arena.allocator.process_rows)
+            for key in ("Total", "Used", "Free"):
+                totals[key] += stats[key]
+            totals["Largest Free"] = max(totals["Largest Free"], stats["Largest Free"])
+            totals["Contended"] += arena.contended
+        totals["Arenas"] = len(self.arenas)
+        totals["External Fragmentation"] = external_fragmentation(totals["Largest Free"], totals["Free"])
+        return totals
+
+
+def worker(allocator, operations, seed, algorithm, max_size, owned):
+    # Random allocations and frees of this thread's own processes
+    rng = random.Random(seed)
+    for _ in range(operations):
+        if owned and rng.random() < 0.5:
+            allocator.deallocate(owned.pop(rng.randrange(len(owned))))
+        else:
+            process_id = allocator.allocate(rng.randint(1, max_size), rng.randint(1, 10), algorithm)
+            if process_id is not None:
+                owned.append(process_id)
+
+
+def run_threads(allocator, threads, operations, seed=0, algorithm="First Fit", max_size=500):
+    # Runs threads workers at once; returns what each still holds and the
+    # wall time taken
+    owned = [[] for _ in range(threads)]
+    pool = [threading.Thread(target=worker, args=(allocator, operations, seed + i, algorithm, max_size, owned[i]))
+            for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return owned, time.perf_counter() - start
+
+
+def check(allocator, owned):
+    # Consistency after a stress run; returns a list of problems found
+    problems = []
+    held = [process_id for processes in owned for process_id in processes]
+    if len(held) != len(set(held)):
+        problems.append("a process ID was handed out twice")
+    if set(held) != set(allocator.process_arenas):
+        problems.append("held processes and the process map differ")
+    for index, arena in enumerate(allocator.arenas):
+        inner = arena.allocator
+        if set(inner.process_rows) != {p for p, a in allocator.process_arenas.items() if a == index}:
+            problems.append(f"arena {index} holds processes the map does not place there")
+        for process_id in inner.process_rows:
+            i = inner.block_of(process_id)
+            if inner.owners[i] != process_id:
+                problems.append(f"arena {index} block {i} is not owned by its process P{process_id}")
+            elif inner.memory_blocks[i] != inner.original_memory[i] - inner.get_process(process_id).size:
+                problems.append(f"arena {index} block {i} has {inner.memory_blocks[i]}KB left over")
+        if len(inner.process_blocks) != len(inner.process_rows):
+            problems.append(f"arena {index} has {len(inner.process_blocks)} blocks in use "
+                            f"for {len(inner.process_rows)} processes")
+    return problems
+
+
+def stress(args):
+    rng = random.Random(args.seed)
+    blocks = [rng.randint(100, 1000) for _ in range(args.blocks)]
+    # Switch threads far more often than usual to shake out races
+    sys.setswitchinterval(1e-6)
+    for round_number in range(args.rounds):
+        allocator = ConcurrentAllocator(blocks, args.arenas)
+        owned, elapsed = run_threads(allocator, args.threads, args.operations, args.seed + round_number * 1000,
+                                     args.algorithm)
+        problems = check(allocator, owned)
+        for process_ids in owned:
+            for process_id in process_ids:
+                allocator.deallocate(process_id)
+        stats = allocator.statistics()
+        if stats["Used"] != 0 or stats["Processes"] != 0:
+            problems.append(f"{stats['Used']}KB still used after freeing everything")
+        print(f"round {round_number + 1}: {args.threads} threads, {elapsed:.2f}s, "
+              f"{stats['Contended']} contended locks, " + ("OK" if not problems else "; ".join(problems)))
+        if problems:
+            return 1
+    return 0
+
+
+def bench(args):
+    # Throughput and lock contention as threads are added, against a single
+    # lock (one arena) and per-arena locks. CPython's GIL runs the allocator
+    # code one thread at a time, so what the arenas cut is the time threads
+    # spend queued on the allocator lock, shown by the contended count.
+    rng = random.Random(args.seed)
+    blocks = [rng.randint(100, 1000) for _ in range(args.blocks)]
+    for arenas in sorted({1, args.arenas}):
+        for threads in args.thread_counts:
+            allocator = ConcurrentAllocator(blocks, arenas)
+            _, elapsed = run_threads(allocator, threads, args.operations, args.seed, args.algorithm)
+            stats = allocator.statistics()
+            total = threads * args.operations
+            print(f"{arenas:>3} arenas  {threads:>3} threads  {total / elapsed:>12,.0f} ops/s  "
+                  f"contended {stats['Contended'] / total:.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress test and benchmark the arena allocator")
+    parser.add_argument("command", choices=("stress", "bench"))
+    parser.add_argument("--blocks", type=int, default=10000)
+    parser.add_argument("--arenas", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=8, help="threads for the stress test")
+    parser.add_argument("--thread-counts", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="thread counts for the benchmark")
+    parser.add_argument("--operations", type=int, default=20000, help="operations per thread")
+    parser.add_argument("--rounds", type=int, default=5, help="stress test rounds")
+    parser.add_argument("--algorithm", choices=[a for a in ALGORITHMS if a != "Buddy System"], default="First Fit")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return stress(args) if args.command == "stress" else bench(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+from allocator import ALGORITHMS, Allocator
+from trace_replay import SIZE_DISTRIBUTIONS, generate_events, random_size
+
+BLOCK_COUNTS = (10, 100, 1000, 10**4, 10**5, 10**6)
+
+# The linear scans are O(n) per request, so past this many blocks they are
+# left out unless asked for
+LINEAR_LIMIT = 10**4
+
+
+def make_blocks(count, distribution, seed, max_block=1000):
+    rng = random.Random(seed)
+    return [random_size(rng, distribution, max_block) for _ in range(count)]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[k]
+
+
+def run_workload(allocator, events, algorithm):
+    # Replays events and returns the per-operation latencies in nanoseconds
+    latencies = []
+    failed = set()
+    clock = time.perf_counter_ns
+    for event in events:
+        if event.op == "alloc":
+            start = clock()
+            if allocator.allocate(event.size, event.priority, algorithm, process_id=event.process_id) is None:
+                failed.add(event.process_id)
+            latencies.append(clock() - start)
+        elif event.process_id in failed:
+            if event.op == "free":
+                failed.discard(event.process_id)
+        elif event.op == "free":
+            start = clock()
+            allocator.deallocate(event.process_id)
+            latencies.append(clock() - start)
+        else:
+            start = clock()
+            if event.op == "suspend":
+                allocator.suspend(event.process_id)
+            else:
+                allocator.resume(event.process_id)
+            latencies.append(clock() - start)
+    return latencies
+
+
+def benchmark(block_count, distribution, algorithm, indexed=True, operations=20000, seed=0, measure_memory=True):
+    blocks = make_blocks(block_count, distribution, seed)
+    events = list(generate_events(operations, seed=seed, size_distribution=distribution))
+
+    allocator = Allocator(blocks, indexed=indexed)
+    wall_start = time.perf_counter()
+    latencies = run_workload(allocator, events, algorithm)
+    elapsed = time.perf_counter() - wall_start
+    stats = allocator.statistics()
+    latencies.sort()
+
+    result = {
+        "Blocks": block_count,
+        "Distribution": distribution,
+        "Algorithm": algorithm,
+        "Indexed": indexed,
+        "Operations": len(latencies),
+        "Seconds": elapsed,
+        "Ops/s": len(latencies) / elapsed if elapsed > 0 else float("inf"),
+        "P50 ns": percentile(latencies, 0.50),
+        "P99 ns": percentile(latencies, 0.99),
+        "External Fragmentation": stats["External Fragmentation"],
+        "Free": stats["Free"],
+        "Used": stats["Used"],
+    }
+
+    if measure_memory:
+        # Separate pass, since tracing allocations slows every operation down
+        tracemalloc.start()
+        allocator = Allocator(blocks, indexed=indexed)
+        run_workload(allocator, events, algorithm)
+        result["Peak Bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(block_counts=BLOCK_COUNTS, distributions=SIZE_DISTRIBUTIONS, algorithms=ALGORITHMS,
+              operations=20000, seed=0, linear_limit=LINEAR_LIMIT, measure_memory=True, progress=None):
+    results = []
+    for block_count in block_counts:
+        for distribution in distributions:
+            for algorithm in algorithms:
+                variants = (True, False) if block_count <= linear_limit else (True,)
+                for indexed in variants:
+                    result = benchmark(block_count, distribution, algorithm, indexed, operations, seed, measure_memory)
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+    return results
+
+
+def save_results(path, results, operations, seed):
+    report = {
+        "Created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "Python": platform.python_version(),
+        "Machine": platform.machine(),
+        "Operations": operations,
+        "Seed": seed,
+        "Results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_results(old_path, new_path):
+    # Throughput ratio new/old for every configuration present in both files
+    def load(path):
+        with open(path) as f:
+            return {(r["Blocks"], r["Distribution"], r["Algorithm"], r["Indexed"]): r for r in json.load(f)["Results"]}
+
+    old, new = load(old_path), load(new_path)
+    return [(key, new[key]["Ops/s"] / old[key]["Ops/s"]) for key in sorted(old.keys() & new.keys(), key=str)
+            if old[key]["Ops/s"]]
+
+
+def format_result(result):
+    variant = "indexed" if result["Indexed"] else "linear"
+    return (f"{result['Blocks']:>8} blocks  {result['Distribution']:<11} {result['Algorithm']:<12} {variant:<7} "
+            f"{result['Ops/s']:>12,.0f} ops/s  p50 {result['P50 ns']:>8,} ns  p99 {result['P99 ns']:>9,} ns  "
+            f"frag {result['External Fragmentation']:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the allocation strategies")
+    parser.add_argument("--blocks", type=int, nargs="+", default=list(BLOCK_COUNTS))
+    parser.add_argument("--distributions", nargs="+", choices=SIZE_DISTRIBUTIONS, default=list(SIZE_DISTRIBUTIONS))
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--linear-limit", type=int, default=LINEAR_LIMIT,
+                        help="largest block count that also runs the unindexed scans")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print throughput ratios against an earlier run")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.blocks, args.distributions, args.algorithms, args.operations, args.seed,
+                        args.linear_limit, not args.no_memory, progress=lambda r: print(format_result(r)))
+    save_results(args.output, results, args.operations, args.seed)
+    print(f"Saved {len(results)} results to {args.output}")
+
+    if args.compare:
+        for key, ratio in compare_results(args.compare, args.output):
+            print(f"{key}: {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import tkinter as tk
+from array import array
+
+from tables import BUDDY_OWNER, NO_OWNER
+
+FREE_COLOR = (144, 238, 144)  # lightgreen
+USED_COLOR = (240, 128, 128)  # lightcoral
+
+
+def heat_color(usage):
+    # Blend from the free colour to the used colour
+    return "#%02x%02x%02x" % tuple(round(f + (u - f) * usage) for f, u in zip(FREE_COLOR, USED_COLOR))
+
+
+class BlockMap(tk.Frame):
+    # Block list drawn on one canvas with virtual scrolling: only the rows in
+    # view have canvas items, and scrolling reuses them for other blocks, so
+    # the widget costs the same for ten blocks or a million. Above it, a
+    # heatmap strip shows all of memory, each column a run of blocks coloured
+    # by the share in use; clicking the strip scrolls there.
+    #
+    # describe(i) gives a block's (text, colour). Call update_block(i) when a
+    # block changes (cheap when it is out of view) and refresh() after the
+    # block layout changes.
+    def __init__(self, master, allocator, describe, on_hover=None, width=360, height=200, row_height=22,
+                 strip_height=12):
+        super().__init__(master)
+        self.allocator = allocator
+        self.describe = describe
+        self.on_hover = on_hover
+        self.row_height = row_height
+        self.width = width
+        self.first = 0  # Block at the top of the view
+        self.hovered = None
+        self.rows = []  # (rectangle, text) per visible row
+
+        self.strip = tk.Canvas(self, width=width, height=strip_height, highlightthickness=0)
+        self.strip.grid(row=0, column=0, columnspan=2, sticky="ew")
+        self.canvas = tk.Canvas(self, width=width, height=height, highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.canvas.bind("<Motion>", self.on_motion)
+        self.canvas.bind("<Leave>", lambda e: setattr(self, "hovered", None))
+        self.strip.bind("<Button-1>", self.on_strip_click)
+        self.strip.bind("<Configure>", lambda e: self.build_strip())
+
+        self.refresh()
+
+    @property
+    def count(self):
+        return len(self.allocator.memory_blocks)
+
+    def usage(self, i):
+        owner = self.allocator.owners[i]
+        if owner == NO_OWNER:
+            return 0.0
+        if owner == BUDDY_OWNER:
+            return 1.0 - self.allocator.memory_blocks[i] / self.allocator.original_memory[i]
+        return 1.0
+
+    def visible_rows(self):
+        return max(1, -(-self.canvas.winfo_height() // self.row_height))
+
+    def refresh(self):
+        # Full rebuild: the block count or every block changed
+        self.usages = array("d", map(self.usage, range(self.count)))
+        self.build_strip()
+        self.set_first(self.first)
+
+    def on_resize(self, event):
+        self.width = event.width
+        self.set_first(self.first)
+
+    # Block rows
+
+    def set_first(self, first):
+        self.first = max(0, min(first, self.count - self.visible_rows() + 1))
+        visible = self.visible_rows()
+        while len(self.rows) < visible:
+            y = len(self.rows) * self.row_height
+            self.rows.append((self.canvas.create_rectangle(0, y, self.width, y + self.row_height - 1, outline="white"),
+                              self.canvas.create_text(6, y + self.row_height // 2, anchor="w")))
+        for slot, (rectangle, text) in enumerate(self.rows):
+            self.canvas.coords(rectangle, 0, slot * self.row_height, self.width, (slot + 1) * self.row_height - 1)
+            self.draw_row(slot)
+        if self.count:
+            self.scrollbar.set(self.first / self.count, min(1.0, (self.first + visible) / self.count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def draw_row(self, slot):
+        rectangle, text = self.rows[slot]
+        i = self.first + slot
+        if slot >= self.visible_rows() or i >= self.count:
+            self.canvas.itemconfigure(rectangle, state="hidden")
+            self.canvas.itemconfigure(text, state="hidden")
+            return
+        label, color = self.describe(i)
+        self.canvas.itemconfigure(rectangle, fill=color, state="normal")
+        self.canvas.itemconfigure(text, text=label, state="normal")
+
+    def redraw(self):
+        # Redraws every row in view
+        for slot in range(len(self.rows)):
+            self.draw_row(slot)
+
+    def update_block(self, i):
+        # Redraws one block's row if in view and its heatmap column
+        slot = i - self.first
+        if 0 <= slot < len(self.rows):
+            self.draw_row(slot)
+        if i < len(self.usages):
+            usage = self.usage(i)
+            self.bucket_sums[i // self.bucket_size] += usage - self.usages[i]
+            self.usages[i] = usage
+            self.draw_bucket(i // self.bucket_size)
+
+    def yview(self, *args):
+        # Scrollbar callback: ("moveto", fraction) or ("scroll", n, what)
+        if args[0] == "moveto":
+            self.set_first(int(float(args[1]) * self.count))
+        else:
+            self.scroll(int(args[1]), args[2])
+
+    def scroll(self, amount, what):
+        step = self.visible_rows() - 1 if what == "pages" else 1
+        self.set_first(self.first + amount * max(1, step))
+
+    def block_at(self, y):
+        i = self.first + int(y) // self.row_height
+        return i if i < self.count else None
+
+    def on_motion(self, event):
+        # Like <Enter> on a per-block widget: reported once per block entered
+        i = self.block_at(event.y)
+        if i != self.hovered:
+            self.hovered = i
+            if i is not None and self.on_hover is not None:
+                self.on_hover(i)
+
+    # Heatmap strip
+
+    def build_strip(self):
+        # One column per bucket of blocks, at most one per pixel
+        self.strip.delete("all")
+        width = max(1, self.strip.winfo_width() if self.strip.winfo_width() > 1 else self.width)
+        self.bucket_size = max(1, -(-self.count // width))
+        buckets = -(-self.count // self.bucket_size)
+        self.bucket_sums = array("d", bytes(8 * buckets))
+        for i, usage in enumerate(self.usages):
+            self.bucket_sums[i // self.bucket_size] += usage
+        self.bucket_width = width / buckets if buckets else width
+        height = int(self.strip["height"])
+        self.buckets = [self.strip.create_rectangle(b * self.bucket_width, 0, (b + 1) * self.bucket_width, height,
+                                                    width=0) for b in range(buckets)]
+        for b in range(buckets):
+            self.draw_bucket(b)
+
+    def draw_bucket(self, b):
+        blocks = min(self.bucket_size, self.count - b * self.bucket_size)
+        self.strip.itemconfigure(self.buckets[b], fill=heat_color(self.bucket_sums[b] / blocks))
+
+    def on_strip_click(self, event):
+        if self.buckets:
+            b = min(len(self.buckets) - 1, int(event.x / self.bucket_width))
+            self.set_first(b * self.bucket_size - self.visible_rows() // 2)
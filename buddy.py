@@ -0,0 +1,99 @@
+class BuddyAllocator:
+    # Binary buddy allocator over an arena of capacity units. Requests are
+    # rounded up to a power of two; a larger free chunk is split in halves
+    # until it matches, and on free a chunk merges with its buddy (the other
+    # half of the same parent) for as long as that buddy is free too.
+    #
+    # A capacity that is not a power of two is cut into aligned power-of-two
+    # chunks from the start of the arena (e.g. 372 = 256 + 64 + 32 + 16 + 4);
+    # buddies never cross those chunk boundaries.
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("Buddy arena capacity must be positive")
+        self.capacity = capacity
+        self.max_order = capacity.bit_length() - 1
+        # free_lists[k] holds the offsets of free chunks of size 2**k; dicts
+        # keep insertion order, so the pick is deterministic
+        self.free_lists = [{} for _ in range(self.max_order + 1)]
+        self.allocations = {}  # owner -> (offset, order)
+        self.free_units = capacity
+
+        offset = 0
+        for order in range(self.max_order, -1, -1):
+            if capacity & (1 << order):
+                self.free_lists[order][offset] = None
+                offset += 1 << order
+
+    @staticmethod
+    def order_for(size):
+        # Smallest k with 2**k >= size
+        return max(0, (size - 1).bit_length())
+
+    def can_allocate(self, size):
+        order = self.order_for(size)
+        return any(self.free_lists[k] for k in range(order, self.max_order + 1))
+
+    def allocate(self, size, owner):
+        # Returns the chunk offset, or None when no free chunk is big enough
+        if owner in self.allocations:
+            raise ValueError(f"{owner} already holds a buddy chunk")
+        order = self.order_for(size)
+        for k in range(order, self.max_order + 1):
+            if self.free_lists[k]:
+                break
+        else:
+            return None
+
+        offset = next(iter(self.free_lists[k]))
+        del self.free_lists[k][offset]
+        while k > order:
+            # Keep the lower half, hand the upper half to the next free list
+            k -= 1
+            self.free_lists[k][offset + (1 << k)] = None
+
+        self.allocations[owner] = (offset, order)
+        self.free_units -= 1 << order
+        return offset
+
+    def free(self, owner):
+        if owner not in self.allocations:
+            return False
+        offset, order = self.allocations.pop(owner)
+        self.free_units += 1 << order
+        while order < self.max_order:
+            buddy = offset ^ (1 << order)
+            if buddy not in self.free_lists[order]:
+                break
+            del self.free_lists[order][buddy]
+            offset = min(offset, buddy)
+            order += 1
+        self.free_lists[order][offset] = None
+        return True
+
+    def chunk_of(self, owner):
+        # (offset, size) of the chunk held by owner
+        offset, order = self.allocations[owner]
+        return offset, 1 << order
+
+    def free_memory(self):
+        return self.free_units
+
+    def largest_free(self):
+        for k in range(self.max_order, -1, -1):
+            if self.free_lists[k]:
+                return 1 << k
+        return 0
+
+    def state(self):
+        # Plain data for saving: the free chunk offsets of each order, in the
+        # order they would be picked, and every owner's chunk
+        return {"Free": [list(free) for free in self.free_lists],
+                "Allocations": [[owner, offset, order] for owner, (offset, order) in self.allocations.items()]}
+
+    @classmethod
+    def from_state(cls, capacity, state):
+        arena = cls(capacity)
+        arena.free_lists = [dict.fromkeys(offsets) for offsets in state["Free"]]
+        arena.allocations = {owner: (offset, order) for owner, offset, order in state["Allocations"]}
+        arena.free_units = capacity - sum(1 << order for _, order in arena.allocations.values())
+        return arena
@@ -0,0 +1,263 @@
+import math
+from array import array
+from itertools import islice
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+MAX_GROUPS = 32  # Blocks are shown in at most this many groups of neighbours
+MAX_PROCESSES = 32  # Highest priority processes shown in the process chart
+
+
+class BlockGroups:
+    # Used and free KB per group of consecutive blocks, kept up to date one
+    # block at a time from allocator events so a frame never rescans memory
+    def __init__(self, allocator, max_groups=MAX_GROUPS):
+        self.allocator = allocator
+        self.max_groups = max_groups
+        self.rebuild()
+
+    def used(self, i):
+        return self.allocator.original_memory[i] - self.allocator.memory_blocks[i]
+
+    def rebuild(self):
+        count = len(self.allocator.memory_blocks)
+        self.size = max(1, -(-count // self.max_groups))
+        groups = -(-count // self.size)
+        self.used_blocks = array("q", map(self.used, range(count)))
+        self.totals = array("q", bytes(8 * groups))
+        self.used_sums = array("q", bytes(8 * groups))
+        for i in range(count):
+            self.totals[i // self.size] += self.allocator.original_memory[i]
+            self.used_sums[i // self.size] += self.used_blocks[i]
+
+    def update(self, i):
+        if i < len(self.used_blocks):
+            used = self.used(i)
+            self.used_sums[i // self.size] += used - self.used_blocks[i]
+            self.used_blocks[i] = used
+
+    def label(self, g):
+        first = g * self.size
+        last = min(first + self.size, len(self.used_blocks))
+        return f"Block {first+1}" if last - first == 1 else f"Blocks {first+1}-{last}"
+
+    def __len__(self):
+        return len(self.totals)
+
+
+class LiveChart:
+    # Matplotlib figure embedded in a Tk window that follows an allocator.
+    # Changes only mark the chart dirty; at most fps times a second the
+    # chart's artists get their new data in place and are blitted over a
+    # cached background. Only when the axes themselves change (tick labels,
+    # limits, the number of artists) is the whole figure drawn again.
+    #
+    # Subclasses register their artists with set_artists() and move them in
+    # update(), which returns True when a full draw is needed.
+    def __init__(self, master, allocator, title, fps=10, figsize=(5, 3.5)):
+        self.allocator = allocator
+        self.interval = max(1, 1000 // fps)
+        self.figure = Figure(figsize=figsize)
+        self.axes = self.figure.add_subplot()
+        self.axes.set_title(title)
+        self.canvas = FigureCanvasTkAgg(self.figure, master)
+        self.widget = self.canvas.get_tk_widget()
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.artists = []
+        self.background = None
+        self.dirty = False
+        self.pending = None
+        self.visible = False
+
+    def show(self, **grid):
+        if self.visible:
+            return
+        self.visible = True
+        self.widget.grid(**grid)
+        self.allocator.subscribe(self.on_change)
+        self.on_change("layout", None)
+
+    def hide(self):
+        # A hidden chart stops listening, so it costs nothing
+        if not self.visible:
+            return
+        self.visible = False
+        self.allocator.unsubscribe(self.on_change)
+        self.widget.grid_remove()
+
+    def toggle(self, **grid):
+        if self.visible:
+            self.hide()
+        else:
+            self.show(**grid)
+
+    def on_change(self, event, index):
+        if event == "record":
+            return  # Always followed by "processes"
+        self.dirty = True
+        if self.pending is None:
+            self.pending = self.widget.after(self.interval, self.frame)
+
+    def frame(self):
+        self.pending = None
+        if not self.dirty or not self.visible:
+            return
+        self.dirty = False
+        if self.update() or self.background is None:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self.background)
+            for artist in self.artists:
+                self.figure.draw_artist(artist)
+            self.canvas.blit(self.figure.bbox)
+
+    def on_draw(self, event):
+        # A full draw leaves out the animated artists: what it drew is the
+        # background to blit them on
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        for artist in self.artists:
+            self.figure.draw_artist(artist)
+
+    def set_artists(self, artists):
+        for artist in self.artists:
+            artist.remove()
+        self.artists = artists
+        for artist in artists:
+            artist.set_animated(True)
+
+    def update(self):
+        raise NotImplementedError
+
+
+class BlockPieChart(LiveChart):
+    # Share of memory per group of blocks, each split into a used and a free
+    # wedge
+    def __init__(self, master, allocator, **kwargs):
+        super().__init__(master, allocator, "Memory Usage", **kwargs)
+        self.groups = BlockGroups(allocator)
+        self.axes.axis("off")
+        self.wedges = []
+
+    def on_change(self, event, index):
+        if event == "block":
+            self.groups.update(index)
+        elif event == "layout":
+            self.groups.rebuild()
+            self.wedges = []
+        super().on_change(event, index)
+
+    def update(self):
+        groups = self.groups
+        rebuilt = len(self.wedges) != 2 * len(groups)
+        if rebuilt:
+            wedges, labels = self.axes.pie([1] * (2 * len(groups)), startangle=140,
+                                           colors=["lightcoral", "lightgreen"] * len(groups),
+                                           wedgeprops={"edgecolor": "white"})
+            self.wedges = wedges
+            self.texts = [self.axes.text(0, 0, "", ha="center", va="center", fontsize=8) for _ in range(len(groups))]
+            self.set_artists(wedges + self.texts)
+
+        total = sum(groups.totals) or 1
+        angle = 140.0
+        for g in range(len(groups)):
+            start = angle
+            for wedge, size in ((self.wedges[2*g], groups.used_sums[g]),
+                                (self.wedges[2*g+1], groups.totals[g] - groups.used_sums[g])):
+                wedge.set_theta1(angle)
+                angle += 360.0 * size / total
+                wedge.set_theta2(angle)
+            middle = math.radians((start + angle) / 2)
+            share = groups.totals[g] / total
+            self.texts[g].set_position((1.15 * math.cos(middle), 1.15 * math.sin(middle)))
+            self.texts[g].set_text(f"{groups.label(g)}\n{share:.1%}" if share >= 0.02 else "")
+        return rebuilt
+
+
+class BlockUsageChart(LiveChart):
+    # Used and free KB of each group of blocks, stacked
+    def __init__(self, master, allocator, **kwargs):
+        super().__init__(master, allocator, "Memory Usage Breakdown", **kwargs)
+        self.groups = BlockGroups(allocator)
+        self.axes.set_ylabel("Memory Size (KB)")
+        self.used_bars = []
+
+    def on_change(self, event, index):
+        if event == "block":
+            self.groups.update(index)
+        elif event == "layout":
+            self.groups.rebuild()
+            self.used_bars = []
+        super().on_change(event, index)
+
+    def update(self):
+        groups = self.groups
+        rebuilt = len(self.used_bars) != len(groups)
+        if rebuilt:
+            positions = range(len(groups))
+            self.used_bars = list(self.axes.bar(positions, [0] * len(groups), color="red", label="Used Memory"))
+            self.free_bars = list(self.axes.bar(positions, [0] * len(groups), color="green", label="Free Memory"))
+            self.axes.set_xticks(positions, [groups.label(g) for g in positions], rotation=45, ha="right", fontsize=8)
+            self.axes.set_ylim(0, max(groups.totals, default=1) * 1.05)
+            self.axes.legend(handles=[self.used_bars[0], self.free_bars[0]] if len(groups) else [], loc="upper right")
+            self.set_artists(self.used_bars + self.free_bars)
+            self.figure.tight_layout()
+
+        for g in range(len(groups)):
+            used = groups.used_sums[g]
+            self.used_bars[g].set_height(used)
+            self.free_bars[g].set_y(used)
+            self.free_bars[g].set_height(groups.totals[g] - used)
+        return rebuilt
+
+
+class ProcessChart(LiveChart):
+    # Size (bars) and priority (line) of the highest priority processes
+    def __init__(self, master, allocator, max_processes=MAX_PROCESSES, **kwargs):
+        super().__init__(master, allocator, "Process Size and Priority Comparison", **kwargs)
+        self.max_processes = max_processes
+        self.axes.set_xlabel("Process ID")
+        self.axes.set_ylabel("Size (KB)", color="tab:blue")
+        self.axes.tick_params(axis="y", labelcolor="tab:blue")
+        self.priority_axes = self.axes.twinx()
+        self.priority_axes.set_ylabel("Priority", color="tab:red")
+        self.priority_axes.tick_params(axis="y", labelcolor="tab:red")
+        positions = range(max_processes)
+        self.bars = list(self.axes.bar(positions, [0] * max_processes, color="tab:blue", alpha=0.6))
+        self.line, = self.priority_axes.plot([], [], color="tab:red", marker="o")
+        # The IDs are drawn on the bars rather than as tick labels, so a
+        # different set of processes can still be blitted
+        self.id_texts = [self.axes.text(position, 0, "", rotation=90, ha="center", va="bottom", fontsize=7)
+                         for position in positions]
+        self.set_artists(self.bars + self.id_texts + [self.line])
+        self.axes.set_xlim(-0.5, max_processes - 0.5)
+        self.axes.set_xticks([])
+        self.size_limit = self.priority_limit = 0
+
+    def on_change(self, event, index):
+        # Blocks changing alone do not move any process
+        if event != "block":
+            super().on_change(event, index)
+
+    def update(self):
+        allocator = self.allocator
+        process_ids = list(islice(allocator.scheduler, self.max_processes))
+        sizes = [allocator.get_process(process_id).size for process_id in process_ids]
+        priorities = [allocator.priority_of(process_id) for process_id in process_ids]
+        for position, bar in enumerate(self.bars):
+            bar.set_height(sizes[position] if position < len(sizes) else 0)
+            self.id_texts[position].set_text(f"P{process_ids[position]}" if position < len(process_ids) else "")
+        self.line.set_data(range(len(priorities)), priorities)
+
+        # The axes change only when the data outgrows their limits, which
+        # grow with headroom so that is rare
+        rebuilt = False
+        if max(sizes, default=0) > self.size_limit:
+            self.size_limit = max(sizes) * 1.5
+            self.axes.set_ylim(0, self.size_limit)
+            rebuilt = True
+        if max(priorities, default=0) > self.priority_limit:
+            self.priority_limit = max(priorities) * 1.5
+            self.priority_axes.set_ylim(0, self.priority_limit)
+            rebuilt = True
+        return rebuilt
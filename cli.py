@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import sys
+
+# Only the headless core is imported here; matplotlib is imported inside
+# plot_blocks when a plot is asked for, and Tk never
+from allocator import ALGORITHMS, BUDDY, Allocator
+from buddy import BuddyAllocator
+from tables import MAX_VALUE
+
+DEFAULT_BLOCKS = [409, 372, 290, 225, 179, 100]
+DEFAULT_STATE = "memory_state.json"
+
+
+def parse_blocks(text):
+    # "500,400,300" -> [500, 400, 300]
+    try:
+        return [int(size) for size in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated block sizes, got {text!r}")
+
+
+def process_size(text):
+    # A size the allocator can store, in KB
+    try:
+        size = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number of KB, got {text!r}")
+    if not 0 < size <= MAX_VALUE:
+        raise argparse.ArgumentTypeError(f"process size must be between 1 and {MAX_VALUE}KB, got {size}")
+    return size
+
+
+def priority(text):
+    # Any priority a signed 64-bit column can hold
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {text!r}")
+    if not -MAX_VALUE - 1 <= value <= MAX_VALUE:
+        raise argparse.ArgumentTypeError(f"priority must be between {-MAX_VALUE - 1} and {MAX_VALUE}, got {value}")
+    return value
+
+
+def load_state(path, blocks=None):
+    # The state file holds the blocks, the processes allocated through the
+    # CLI with the block each one is in (buddy arenas with their chunks),
+    # the Next Fit cursor and the next process ID, so the allocator comes
+    # back exactly as it was whatever number of commands came before
+    if not os.path.exists(path):
+        return Allocator(blocks or DEFAULT_BLOCKS)
+    with open(path) as f:
+        state = json.load(f)
+    allocator = Allocator(state["Blocks"])
+    if "Operations" in state:
+        # Older state files logged every allocation and free instead
+        for operation in state["Operations"]:
+            if operation[0] == "alloc":
+                _, process_id, size, priority, algorithm, name = operation
+                allocator.allocate(size, priority, algorithm, name, process_id)
+            else:
+                allocator.deallocate(operation[1])
+        return allocator
+    arenas = {int(index): BuddyAllocator.from_state(allocator.original_memory[int(index)], arena)
+              for index, arena in state["Arenas"].items()}
+    allocator.restore(state["Processes"], arenas, state["NextFit"])
+    allocator.next_process_id = max(allocator.next_process_id, state["NextID"])
+    return allocator
+
+
+def save_state(path, allocator):
+    # Written to a temporary file first so an interrupted save leaves the
+    # old state intact
+    processes = [dict(proc.as_dict(), Block=allocator.block_of(proc.id)) for proc in allocator.process_list]
+    state = {"Blocks": list(allocator.original_memory), "Processes": processes,
+             "Arenas": {index: arena.state() for index, arena in allocator.buddy_arenas.items()},
+             "NextFit": allocator.next_fit_position, "NextID": allocator.next_process_id}
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def cmd_allocate(args):
+    allocator = load_state(args.state, args.blocks)
+    status = 0
+    for size in args.sizes:
+        process_id = allocator.allocate(size, args.priority, args.algorithm, args.name)
+        if process_id is None:
+            print(f"No suitable block found for process size {size}KB", file=sys.stderr)
+            status = 1
+        else:
+            print(f"P{process_id}: {size}KB in block {allocator.block_of(process_id) + 1}")
+    save_state(args.state, allocator)
+    return status
+
+
+def cmd_free(args):
+    allocator = load_state(args.state, args.blocks)
+    status = 0
+    for process_id in args.process_ids:
+        if allocator.deallocate(process_id):
+            print(f"P{process_id} deallocated")
+        else:
+            print(f"Process P{process_id} not found", file=sys.stderr)
+            status = 1
+    save_state(args.state, allocator)
+    return status
+
+
+def plot_blocks(allocator):
+    import matplotlib.pyplot as plt
+
+    processes = allocator.processes
+    sizes = [allocator.memory_blocks[i] if processes[i] is None else allocator.original_memory[i] - allocator.memory_blocks[i]
+             for i in range(len(allocator.memory_blocks))]
+    colors = ["lightgreen" if processes[i] is None else "lightcoral" for i in range(len(allocator.memory_blocks))]
+    plt.bar(range(1, len(sizes) + 1), sizes, color=colors)
+    plt.xlabel("Block")
+    plt.ylabel("KB (free in green, used in red)")
+    plt.title("Memory Usage")
+    plt.show()
+
+
+def cmd_report(args):
+    allocator = load_state(args.state, args.blocks)
+    stats = allocator.statistics()
+    print(f"Total: {stats['Total']}KB, Used: {stats['Used']}KB, Free: {stats['Free']}KB, "
+          f"Largest Free: {stats['Largest Free']}KB, External Fragmentation: {stats['External Fragmentation']:.2%}")
+    for i, owner in enumerate(allocator.processes):
+        if owner is None:
+            held = "Free"
+        elif owner == BUDDY:
+            held = "Buddy arena holding " + ", ".join(f"P{pid}" for pid in allocator.buddy_arenas[i].allocations)
+        else:
+            held = f"Allocated to P{owner}"
+        print(f"Block {i+1}: {allocator.memory_blocks[i]}KB - {held}")
+    for proc in allocator.process_list:
+        name = f" {proc['Name']}" if "Name" in proc else ""
+        print(f"P{proc['ID']}{name} ({proc['Size']}KB, Priority: {proc['Priority']}, Status: {proc['Status']})")
+    if args.plot:
+        plot_blocks(allocator)
+    return 0
+
+
+def cmd_replay(args):
+    from trace_replay import read_trace, replay
+
+    allocator = Allocator(args.blocks or DEFAULT_BLOCKS)
+    for counts in replay(read_trace(args.trace), allocator, args.algorithm, args.interval):
+        print(f"{counts['Start']:>10.3f}s  {counts['Events']:>8} events  {counts['Allocations']:>7} allocs  "
+              f"{counts['Failures']:>6} failed  success {counts['Success Rate']:.1%}  "
+              f"frag {counts['External Fragmentation']:.2f}  {counts['Ops/s']:>12,.0f} ops/s")
+    return 0
+
+
+def cmd_bench(args):
+    import benchmark
+
+    benchmark.main(args.extra)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless memory allocator")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="state file kept between commands")
+    parser.add_argument("--blocks", type=parse_blocks,
+                        help="comma-separated block sizes in KB, used when the state file does not exist yet "
+                             "(and by replay)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    allocate = commands.add_parser("allocate", help="allocate one process per size")
+    allocate.add_argument("sizes", type=process_size, nargs="+")
+    allocate.add_argument("--priority", type=priority, default=1)
+    allocate.add_argument("--algorithm", choices=ALGORITHMS, default="First Fit")
+    allocate.add_argument("--name")
+    allocate.set_defaults(run=cmd_allocate)
+
+    free = commands.add_parser("free", help="deallocate processes by ID")
+    free.add_argument("process_ids", type=int, nargs="+")
+    free.set_defaults(run=cmd_free)
+
+    report = commands.add_parser("report", help="print statistics, blocks and processes")
+    report.add_argument("--plot", action="store_true", help="also plot the blocks (needs matplotlib)")
+    report.set_defaults(run=cmd_report)
+
+    replay = commands.add_parser("replay", help="replay a trace file on a fresh allocator")
+    replay.add_argument("trace")
+    replay.add_argument("--algorithm", choices=ALGORITHMS, default="First Fit")
+    replay.add_argument("--interval", type=float, default=1.0, help="seconds of trace time per report line")
+    replay.set_defaults(run=cmd_replay)
+
+    bench = commands.add_parser("bench", help="run the benchmark suite; other options are passed to benchmark.py")
+    bench.set_defaults(run=cmd_bench)
+
+    args, args.extra = parser.parse_known_args(argv)
+    if args.extra and args.command != "bench":
+        parser.error(f"unrecognized arguments: {' '.join(args.extra)}")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+def plan_compaction(is_free, free_sizes, used_sizes, process_size=None):
+    # Chooses a window of consecutive positions to compact, returned as
+    # (first, last, bytes to move), or None when no window frees enough.
+    #
+    # Compacting a window slides its allocated entries together and merges
+    # its free entries into one, so every allocated entry inside it moves.
+    # With process_size None the window runs from the first free entry to
+    # the end of memory (full compaction). Otherwise it is the cheapest
+    # window whose free space adds up to process_size: two pointers over
+    # the positions, since the best start never moves left as the end moves
+    # right. The window always starts and ends on a free entry.
+    n = len(is_free)
+    if process_size is None:
+        first = next((i for i in range(n) if is_free[i]), None)
+        if first is None:
+            return None
+        return first, n - 1, sum(used_sizes[first:])
+
+    best = None
+    left = 0
+    free_total = 0
+    cost = 0
+    for right in range(n):
+        if is_free[right]:
+            free_total += free_sizes[right]
+        else:
+            cost += used_sizes[right]
+        if not is_free[right] or free_total < process_size:
+            continue
+
+        # Drop everything on the left that is not needed to stay large enough
+        while True:
+            if not is_free[left]:
+                cost -= used_sizes[left]
+            elif free_total - free_sizes[left] >= process_size:
+                free_total -= free_sizes[left]
+            else:
+                break
+            left += 1
+        if best is None or cost < best[2]:
+            best = (left, right, cost)
+    return best
@@ -0,0 +1,167 @@
+from bisect import bisect_left, insort
+
+
+class SortedFreeIndex:
+    # Free blocks as (size, block index) pairs in ascending order. The pairs
+    # are kept in short sorted runs with a list of each run's last entry, so
+    # a lookup is two binary searches and an update only shifts one run.
+    LOAD = 512
+
+    def __init__(self, entries=()):
+        entries = sorted(entries)
+        self.runs = [entries[i:i+self.LOAD] for i in range(0, len(entries), self.LOAD)]
+        self.maxes = [run[-1] for run in self.runs]
+        self.count = len(entries)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for run in self.runs:
+            yield from run
+
+    def add(self, size, index):
+        entry = (size, index)
+        self.count += 1
+        if not self.runs:
+            self.runs.append([entry])
+            self.maxes.append(entry)
+            return
+
+        k = bisect_left(self.maxes, entry)
+        if k == len(self.maxes):
+            k -= 1
+            self.runs[k].append(entry)
+            self.maxes[k] = entry
+        else:
+            insort(self.runs[k], entry)
+
+        run = self.runs[k]
+        if len(run) > 2 * self.LOAD:
+            # Split an overgrown run in half
+            self.runs[k+1:k+1] = [run[self.LOAD:]]
+            del run[self.LOAD:]
+            self.maxes[k:k+1] = [run[-1], self.runs[k+1][-1]]
+
+    def remove(self, size, index):
+        entry = (size, index)
+        k = bisect_left(self.maxes, entry)
+        if k < len(self.maxes):
+            run = self.runs[k]
+            j = bisect_left(run, entry)
+            if j < len(run) and run[j] == entry:
+                del run[j]
+                self.count -= 1
+                if run:
+                    self.maxes[k] = run[-1]
+                else:
+                    del self.runs[k]
+                    del self.maxes[k]
+                return
+        raise KeyError(entry)
+
+    def replace(self, removed, added):
+        # Removes and adds many entries at once. Past a few per run it is
+        # cheaper to filter every run in one pass and re-sort the result
+        # (nearly sorted already) than to search for each entry.
+        if (len(removed) + len(added)) * 16 < self.count:
+            for entry in removed:
+                self.remove(*entry)
+            for entry in added:
+                self.add(*entry)
+            return
+        removed = set(removed)
+        entries = [entry for entry in self if entry not in removed]
+        if len(entries) + len(removed) != self.count:
+            raise KeyError("Entries to remove are not all in the index")
+        self.__init__(entries + list(added))
+
+    def ceiling(self, size):
+        # Smallest free block of at least size, lowest index among equal sizes
+        entry = (size, -1)
+        k = bisect_left(self.maxes, entry)
+        if k == len(self.maxes):
+            return None
+        run = self.runs[k]
+        return run[bisect_left(run, entry)]
+
+    def iter_from(self, entry):
+        # Entries from entry onwards, in order
+        k = bisect_left(self.maxes, entry)
+        if k == len(self.maxes):
+            return
+        run = self.runs[k]
+        for i in range(bisect_left(run, entry), len(run)):
+            yield run[i]
+        for k in range(k + 1, len(self.runs)):
+            yield from self.runs[k]
+
+    def largest(self):
+        # Largest free block, lowest index among equal sizes
+        if not self.maxes:
+            return None
+        return self.ceiling(self.maxes[-1][0])
+
+
+class MaxSegmentTree:
+    # Largest value over every power-of-two range of block positions, stored
+    # as an implicit binary tree in a flat list (root at 1, leaves from size).
+    # Allocated blocks hold -1 so they never satisfy a request.
+    def __init__(self, values):
+        self.n = len(values)
+        self.size = 1
+        while self.size < self.n:
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size+self.n] = values
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2*i], self.tree[2*i+1])
+
+    def update(self, index, value):
+        tree = self.tree
+        i = index + self.size
+        tree[i] = value
+        i >>= 1
+        while i:
+            best = max(tree[2*i], tree[2*i+1])
+            if tree[i] == best:
+                break  # Nothing above can change either
+            tree[i] = best
+            i >>= 1
+
+    def assign(self, start, values):
+        # Replaces every value from start on with values, which may be fewer
+        # than before (the range then ends sooner), and recomputes only the
+        # nodes above the leaves that changed
+        tree = self.tree
+        end = start + len(values)
+        lo = start + self.size
+        hi = self.size + max(self.n, end) - 1
+        tree[lo:lo+len(values)] = values
+        tree[self.size+end:hi+1] = [-1] * (hi + 1 - self.size - end)
+        self.n = end
+        lo >>= 1
+        hi >>= 1
+        while lo:
+            tree[lo:hi+1] = map(max, tree[2*lo:2*hi+2:2], tree[2*lo+1:2*hi+2:2])
+            lo >>= 1
+            hi >>= 1
+
+    def leftmost(self, value, start=0):
+        # Lowest position from start onwards holding at least value, or -1
+        tree = self.tree
+        if start >= self.n:
+            return -1
+        i = start + self.size
+        if start == 0:
+            i = 1
+        # Climb to the first subtree right of start that holds a big enough value
+        while tree[i] < value:
+            while i & 1:
+                i >>= 1
+            if i == 0:
+                return -1
+            i += 1
+        while i < self.size:
+            i = 2*i if tree[2*i] >= value else 2*i + 1
+        return i - self.size
@@ -1,27 +1,31 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import time
-import matplotlib.pyplot as plt
-import json
+from allocator import Allocator
+from block_map import BlockMap
+from charts import BlockUsageChart
+from journal import Journal
+from refresh import RefreshScheduler
+from simulation import Simulation
+from swap import SwapManager
 
 class MemoryManager:
     def __init__(self, master):
         self.master = master
         self.master.title("Memory Management System")
 
-        # Set up initial memory blocks
-        self.memory_blocks = [100, 200, 300, 400, 500]
-        self.original_memory = self.memory_blocks.copy()
-        self.processes = [None] * len(self.memory_blocks)
-        self.process_list = []
+        # Set up initial memory blocks; the allocator holds them and the process table
+        self.allocator = Allocator([100, 200, 300, 400, 500])
+        self.allocator.subscribe(self.on_allocator_change)
         self.terminated_processes = []
 
-        # GUI Labels for each memory block
-        self.block_labels = []
-        for i, block in enumerate(self.memory_blocks):
-            label = tk.Label(self.master, text=f"Block {i+1}: {block}KB - Free", bg="lightgreen", width=40)
-            label.grid(row=i, column=0)
-            self.block_labels.append(label)
+        # Swap space as large as memory; allocations and frees go through it
+        # so processes can be swapped out when memory runs out
+        self.swap = SwapManager(self.allocator, "swap.bin", sum(self.allocator.original_memory))
+
+        # Block map for the memory blocks; only the blocks in view are drawn
+        self.block_map = BlockMap(self.master, self.allocator, self.describe_block, height=120)
+        self.block_map.grid(row=0, column=0, rowspan=6, columnspan=2, sticky="nsew")
 
         # Input for process number and size
         tk.Label(self.master, text="Process ID:").grid(row=6, column=0)
@@ -59,38 +63,64 @@ class MemoryManager:
         tk.Button(self.master, text="Apply Aging", command=self.apply_aging).grid(row=14, column=0)
         tk.Button(self.master, text="Swap Processes", command=self.swap_processes).grid(row=14, column=1)
 
+        # Changes are redrawn once per frame, only where they show
+        self.refresher = RefreshScheduler(self.master, self.block_map)
+        self.refresher.add_label("fragmentation", self.fragmentation_label, self.fragmentation_text)
+        self.refresher.add_label("statistics", self.statistics_label, self.statistics_text)
+        self.refresher.add_label("processes", self.process_info_label, self.process_info_text)
+
+        # Usage chart embedded to the right, updated live while shown
+        self.usage_chart = BlockUsageChart(self.master, self.allocator)
+
+        # Process state persists as a snapshot (process_state.json) plus a
+        # journal of the changes since (process_state.journal)
+        self.journal = Journal(self.allocator, "process_state")
         self.load_saved_state()  # Load saved process state on startup
 
+    @property
+    def memory_blocks(self):
+        return self.allocator.memory_blocks
+
+    @property
+    def original_memory(self):
+        return self.allocator.original_memory
+
+    @property
+    def processes(self):
+        return self.allocator.processes
+
+    @property
+    def process_list(self):
+        return self.allocator.process_list
+
+    def on_allocator_change(self, event, index):
+        if event == "block":
+            self.refresher.mark_block(index)
+            self.refresher.mark("fragmentation", "statistics")
+        elif event == "layout":
+            self.refresher.mark_layout()
+            self.refresher.mark("fragmentation", "statistics")
+        elif event == "processes":
+            self.refresher.mark("processes")
+            self.refresher.mark_view()  # Blocks show their process's priority
+
+    def describe_block(self, index):
+        process_id = self.processes[index]
+        if process_id is None:
+            return f"Block {index+1}: {self.memory_blocks[index]}KB - Free", "lightgreen"
+        process_priority = self.allocator.get_process(process_id)["Priority"]
+        return f"Block {index+1}: {self.memory_blocks[index]}KB - P{process_id} (Priority: {process_priority})", "red"
+
     def allocate_first_fit(self):
         try:
             process_id = int(self.process_num_var.get())
             process_size = int(self.process_size_var.get())
             process_priority = int(self.process_priority_var.get())
-            allocated = False
-
-            for i in range(len(self.memory_blocks)):
-                if self.memory_blocks[i] >= process_size and self.processes[i] is None:
-                    self.processes[i] = process_id
-                    self.memory_blocks[i] -= process_size
-                    self.block_labels[i].config(text=f"Block {i+1}: {self.memory_blocks[i]}KB - P{process_id} (Priority: {process_priority})", bg="red")
-
-                    # Store the process details
-                    self.process_list.append({
-                        "ID": process_id,
-                        "Size": process_size,
-                        "Priority": process_priority,
-                        "StartTime": time.time(),
-                        "Status": "Running"
-                    })
-                    allocated = True
-                    break
+            allocated = self.swap.allocate(process_size, process_priority, "First Fit", process_id=process_id) is not None
 
             if not allocated:
                 messagebox.showwarning("Allocation Failed", "Not enough memory for this process!")
             else:
-                self.calculate_fragmentation()
-                self.show_statistics()
-                self.update_process_info()
                 self.save_state()  # Save the process state
 
         except ValueError:
@@ -99,112 +129,89 @@ class MemoryManager:
     def deallocate_memory(self):
         try:
             process_id = int(self.process_num_var.get())
-            found = False
-
-            for i, proc_id in enumerate(self.processes):
-                if proc_id == process_id:
-                    self.memory_blocks[i] += self.original_memory[i]
-                    self.processes[i] = None
-                    self.block_labels[i].config(text=f"Block {i+1}: {self.memory_blocks[i]}KB - Free", bg="lightgreen")
-                    found = True
-                    self.terminated_processes.append({"ID": process_id, "EndTime": time.time()})
-                    messagebox.showinfo("Deallocation", f"Process P{process_id} deallocated successfully!")
-                    break
+            found = self.swap.deallocate(process_id)
+            if found:
+                self.terminated_processes.append({"ID": process_id, "EndTime": time.time()})
+                messagebox.showinfo("Deallocation", f"Process P{process_id} deallocated successfully!")
 
             if not found:
                 messagebox.showwarning("Not Found", "Process not found!")
             else:
-                self.calculate_fragmentation()
-                self.show_statistics()
                 self.save_state()  # Save the process state
 
         except ValueError:
             messagebox.showerror("Input Error", "Please enter a valid process ID!")
 
     def defragment_memory(self):
-        free_memory = sum(self.memory_blocks[i] for i in range(len(self.memory_blocks)) if self.processes[i] is None)
-        self.memory_blocks = [self.memory_blocks[i] for i in range(len(self.memory_blocks)) if self.processes[i] is not None]
-        self.memory_blocks.append(free_memory)
-
-        for i, label in enumerate(self.block_labels):
-            if i < len(self.memory_blocks):
-                if self.processes[i] is None:
-                    label.config(text=f"Block {i+1}: {self.memory_blocks[i]}KB - Free", bg="lightgreen")
-                else:
-                    label.config(text=f"Block {i+1}: {self.memory_blocks[i]}KB - P{self.processes[i]}", bg="red")
-            else:
-                label.config(text=f"Block {i+1}: N/A", bg="lightgrey")
-
-        messagebox.showinfo("Defragmentation", "Memory successfully defragmented!")
+        report = self.allocator.defragment()
+        messagebox.showinfo("Defragmentation", f"Memory successfully defragmented! Moved {report['Moved']}KB in {report['Relocations']} relocations.")
         self.save_state()  # Save the process state
 
-    def calculate_fragmentation(self):
-        free_blocks = [self.memory_blocks[i] for i in range(len(self.memory_blocks)) if self.processes[i] is None]
-        total_fragmentation = sum(free_blocks)
-        self.fragmentation_label.config(text=f"Fragmentation: {total_fragmentation}KB")
+    def fragmentation_text(self):
+        stats = self.allocator.statistics()
+        return f"Fragmentation: {stats['Free']}KB free, largest block {stats['Largest Free']}KB, external {stats['External Fragmentation']:.2f}"
 
-    def show_statistics(self):
-        total_memory = sum(self.original_memory)
-        used_memory = sum(self.original_memory[i] - self.memory_blocks[i] for i in range(len(self.memory_blocks)) if self.processes[i] is not None)
-        free_memory = total_memory - used_memory
-        self.statistics_label.config(text=f"Memory Statistics - Total: {total_memory}KB, Used: {used_memory}KB, Free: {free_memory}KB")
+    def statistics_text(self):
+        stats = self.allocator.statistics()
+        return f"Memory Statistics - Total: {stats['Total']}KB, Used: {stats['Used']}KB, Free: {stats['Free']}KB"
 
     def memory_usage_graph(self):
-        used_memory = [self.original_memory[i] - self.memory_blocks[i] for i in range(len(self.memory_blocks))]
-        free_memory = [self.memory_blocks[i] for i in range(len(self.memory_blocks))]
-
-        labels = [f"Block {i+1}" for i in range(len(self.memory_blocks))]
-        plt.bar(labels, used_memory, label='Used Memory', color='red')
-        plt.bar(labels, free_memory, bottom=used_memory, label='Free Memory', color='green')
-
-        plt.xlabel('Memory Blocks')
-        plt.ylabel('Memory Size (KB)')
-        plt.title('Memory Usage Breakdown')
-        plt.legend()
-        plt.show()
+        self.usage_chart.toggle(row=0, column=2, rowspan=15, padx=10)
 
     def compact_memory_view(self):
         compact_view = "\n".join([f"Block {i+1}: {self.memory_blocks[i]}KB" for i in range(len(self.memory_blocks))])
         messagebox.showinfo("Compact Memory View", compact_view)
 
     def apply_aging(self):
-        for proc in self.process_list:
-            proc['Priority'] += 1  # Increase priority as process ages
+        self.allocator.age()  # Increase every priority as processes age
         messagebox.showinfo("Aging", "Process priorities increased due to aging.")
         self.save_state()  # Save the process state
 
     def swap_processes(self):
-        messagebox.showinfo("Swapping", "Feature under development! This will swap lower priority processes.")
+        # Swaps out the lowest priority process in memory (restored processes
+        # hold none)
+        process_ids = [process_id for process_id in self.allocator.process_column("ID")
+                       if self.allocator.holds_memory(process_id)]
+        if process_ids:
+            self.swap.swap_out(process_ids[-1])
+        stats = self.swap.statistics()
+        messagebox.showinfo("Swapping", f"Swapped out: {stats['Swapped']} processes ({stats['Swap Used']}KB)\n"
+                            f"Swap I/O: {stats['Swap Out Bytes']} bytes out, {stats['Swap In Bytes']} bytes in\n"
+                            f"Mean latency: {stats['Mean Swap Out Latency'] * 1e6:.0f}us out, {stats['Mean Swap In Latency'] * 1e6:.0f}us in\n"
+                            f"Allocation failures avoided: {stats['Hit Rate']:.0%}")
 
     def simulate_execution(self):
-        for i in range(len(self.process_list)):
-            if self.process_list[i]['Status'] == "Running":
-                self.process_list[i]['Size'] -= 10  # Simulate size reduction
-                if self.process_list[i]['Size'] <= 0:
-                    self.process_list[i]['Status'] = "Terminated"
-        self.save_state()  # Save the process state
-
-    def update_process_info(self):
+        # Runs a minute of simulated arrivals, CPU bursts and completions on a
+        # separate allocator with the same blocks, leaving this one untouched
+        simulation = Simulation(Allocator(self.original_memory), "First Fit", arrival_rate=2.0, max_size=max(self.original_memory))
+        report = simulation.run(60.0)
+        messagebox.showinfo("Simulation", f"Simulated {report['Simulated Time']:.0f}s: {report['Completions']} of {report['Arrivals']} processes completed\n"
+                            f"Throughput: {report['Throughput']:.2f} processes/s\n"
+                            f"Mean wait for memory: {report['Mean Admission Wait']:.2f}s, for CPU: {report['Mean Ready Wait']:.3f}s\n"
+                            f"Mean memory utilization: {report['Mean Memory Utilization']:.0%}, CPU: {report['CPU Utilization']:.0%}")
+
+    def process_info_text(self):
         if self.process_list:
-            process_info = "\n".join([f"P{proc['ID']} (Priority: {proc['Priority']}, Size: {proc['Size']}KB, Status: {proc['Status']})" for proc in self.process_list])
-        else:
-            process_info = "No Running Processes"
-        self.process_info_label.config(text=process_info)
+            return "\n".join([f"P{proc['ID']} (Priority: {proc['Priority']}, Size: {proc['Size']}KB, Status: {proc['Status']})" for proc in self.process_list])
+        return "No Running Processes"
 
     def save_state(self):
-        with open("process_state.json", "w") as f:
-            json.dump(self.process_list, f)
+        # Every change is already in the journal; this makes it durable now
+        self.journal.sync()
 
     def load_saved_state(self):
-        try:
-            with open("process_state.json", "r") as f:
-                self.process_list = json.load(f)
-            self.update_process_info()
-        except FileNotFoundError:
-            pass
+        self.journal.load()  # Snapshot, then the journal replayed over it
+
+    def close(self):
+        # Swapped-out images do not outlive the run, but their processes stay
+        # in the journal with status Swapped
+        self.journal.close()
+        self.swap.close()
 
 
 # Main Application
-root = tk.Tk()
-app = MemoryManager(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MemoryManager(root)
+    root.mainloop()
+    app.close()
@@ -0,0 +1,145 @@
+import json
+import os
+import time
+
+from tables import status_code
+
+
+def apply_record(table, record):
+    # Redoes one journaled change on a process table
+    kind = record[0]
+    if kind == "add":
+        # Records from before arrival numbers were journaled have none
+        _, process_id, size, priority, status, start_time, name, *arrival = record
+        table.add_row(process_id, size, priority, status_code(status), start_time, name, *arrival)
+    elif kind == "remove":
+        table.remove_process(record[1])
+    elif kind == "status":
+        table.set_status(record[1], record[2])
+    elif kind == "rename":
+        table.rename(record[1], record[2])
+    elif kind == "priority":
+        table.set_priority(record[1], record[2])
+    elif kind == "age":
+        table.age(record[1])
+    elif kind == "clear":
+        table.clear_processes()
+    else:
+        raise ValueError(f"Unknown journal record: {kind}")
+
+
+class Journal:
+    # Persists a process table as a snapshot plus an append-only journal of
+    # the changes made since, so saving costs one short line per change
+    # whatever the size of the table.
+    #
+    # Every change the table reports (its "record" events) is appended to
+    # path.journal as [sequence, *record]. Appends are flushed and fsynced in
+    # batches: every sync_every records, or on the first record more than
+    # sync_interval seconds after the last sync. Once the journal holds more
+    # records than max(snapshot_every, processes), the whole table is written
+    # to path.json (through a temporary file, so a crash leaves the old
+    # snapshot) and the journal is truncated. Snapshots therefore cost O(1)
+    # per change amortized.
+    #
+    # The snapshot stores the sequence number it includes; loading replays
+    # only later records, so a crash between the snapshot and the truncation
+    # replays nothing twice. A torn last line from a crash mid-append is
+    # dropped. The snapshot also keeps each process's arrival number and the
+    # table's counters, so a reloaded table orders equal priorities and hands
+    # out IDs exactly as the original would have.
+    def __init__(self, table, path="process_state", sync_every=64, sync_interval=1.0, snapshot_every=1000):
+        self.table = table
+        self.snapshot_path = path + ".json"
+        self.journal_path = path + ".journal"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.file = None
+        self.sequence = 0
+        self.records = 0  # Records in the journal file
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def load(self):
+        # Rebuilds the table from the snapshot and the journal, then starts
+        # journaling its changes
+        try:
+            with open(self.snapshot_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {"Sequence": 0, "Processes": []}
+        if isinstance(state, list):
+            state = {"Sequence": 0, "Processes": state}  # Plain process list from before the journal
+        self.sequence = state["Sequence"]
+        table = self.table
+        table.replace_processes(state["Processes"], state.get("Arrivals"))
+        table.arrivals = max(table.arrivals, state.get("NextArrival", 0))
+        table.next_process_id = max(table.next_process_id, state.get("NextID", 1))
+
+        self.records = 0
+        good_end = 0
+        try:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("Torn record")
+                        sequence, *record = json.loads(line)
+                    except ValueError:
+                        break
+                    if sequence > self.sequence:
+                        apply_record(self.table, record)
+                        self.sequence = sequence
+                    good_end += len(line)
+                    self.records += 1
+        except FileNotFoundError:
+            pass
+
+        self.file = open(self.journal_path, "a")
+        self.file.truncate(good_end)
+        self.table.subscribe(self.on_change)
+
+    def on_change(self, event, record):
+        if event == "record":
+            self.append(record)
+
+    def append(self, record):
+        self.sequence += 1
+        self.file.write(json.dumps([self.sequence, *record]) + "\n")
+        self.records += 1
+        self.unsynced += 1
+        if self.unsynced >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+        if self.records >= max(self.snapshot_every, len(self.table.process_rows)):
+            self.snapshot()
+
+    def sync(self):
+        if self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def snapshot(self):
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "w") as f:
+            table = self.table
+            json.dump({"Sequence": self.sequence, "Processes": [proc.as_dict() for proc in table.process_list],
+                       "Arrivals": table.arrival_numbers(), "NextArrival": table.arrivals,
+                       "NextID": table.next_process_id}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
+        self.file.truncate(0)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.records = 0
+        self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            self.table.unsubscribe(self.on_change)
+            self.sync()
+            self.file.close()
+            self.file = None
@@ -0,0 +1,278 @@
+import random
+import time
+from array import array
+from collections import OrderedDict
+
+from allocator import ProcessTable
+
+REPLACEMENT_POLICIES = ("FIFO", "LRU", "CLOCK", "Aging")
+
+
+class FIFOReplacement:
+    # Evicts the frame loaded longest ago; frames in load order
+    def __init__(self, frame_count):
+        self.frames = OrderedDict()
+
+    def insert(self, frame):
+        self.frames[frame] = None
+
+    def touch(self, frame):
+        pass
+
+    def remove(self, frame):
+        del self.frames[frame]
+
+    def victim(self):
+        return self.frames.popitem(last=False)[0]
+
+
+class LRUReplacement(FIFOReplacement):
+    # Evicts the least recently used frame: every hit moves its frame to the
+    # end of the ordered dict, so both hits and evictions are O(1)
+    def touch(self, frame):
+        self.frames.move_to_end(frame)
+
+
+class ClockReplacement:
+    # Second chance: frames sit on a ring with a reference bit set on every
+    # use; the hand clears bits as it sweeps and evicts the first frame whose
+    # bit is already clear
+    def __init__(self, frame_count):
+        self.referenced = bytearray(frame_count)
+        self.loaded = bytearray(frame_count)
+        self.hand = 0
+
+    def insert(self, frame):
+        self.loaded[frame] = 1
+        self.referenced[frame] = 1
+
+    def touch(self, frame):
+        self.referenced[frame] = 1
+
+    def remove(self, frame):
+        self.loaded[frame] = 0
+
+    def victim(self):
+        referenced, loaded = self.referenced, self.loaded
+        n = len(loaded)
+        while True:
+            frame = self.hand
+            self.hand = (frame + 1) % n
+            if loaded[frame]:
+                if not referenced[frame]:
+                    loaded[frame] = 0
+                    return frame
+                referenced[frame] = 0
+
+
+class AgingReplacement:
+    # Approximates LRU with an 8-bit history per frame: every interval
+    # accesses each counter shifts right and takes the frame's reference bit
+    # as its top bit, and the frame with the smallest counter is evicted
+    # (unreferenced first on ties). A newly loaded page starts as if used in
+    # the last interval, so it is not the next victim. Ticks and evictions
+    # are O(frames).
+    def __init__(self, frame_count, interval=64):
+        self.counters = array("B", bytes(frame_count))
+        self.referenced = bytearray(frame_count)
+        self.loaded = bytearray(frame_count)
+        self.interval = interval
+        self.until_tick = interval
+
+    def insert(self, frame):
+        self.loaded[frame] = 1
+        self.counters[frame] = 0x80
+        self.referenced[frame] = 1
+        self.count_access()
+
+    def touch(self, frame):
+        self.referenced[frame] = 1
+        self.count_access()
+
+    def count_access(self):
+        self.until_tick -= 1
+        if self.until_tick == 0:
+            self.until_tick = self.interval
+            counters, referenced = self.counters, self.referenced
+            for frame in range(len(counters)):
+                counters[frame] = (counters[frame] >> 1) | (referenced[frame] << 7)
+                referenced[frame] = 0
+
+    def remove(self, frame):
+        self.loaded[frame] = 0
+
+    def victim(self):
+        counters, referenced, loaded = self.counters, self.referenced, self.loaded
+        frame = min((f for f in range(len(counters)) if loaded[f]), key=lambda f: (counters[f], referenced[f]))
+        loaded[frame] = 0
+        return frame
+
+
+POLICY_CLASSES = {"FIFO": FIFOReplacement, "LRU": LRUReplacement, "CLOCK": ClockReplacement,
+                  "Aging": AgingReplacement}
+
+
+class PagedMemory(ProcessTable):
+    # Paging mode: physical memory is frame_count frames of page_size KB and
+    # each process gets a page table with one entry per page of its size,
+    # holding the frame the page is loaded in or -1. Pages are loaded on
+    # first access (demand paging); when no frame is free the replacement
+    # policy picks one to evict. Translations go through a TLB of tlb_size
+    # entries kept in LRU order.
+    def __init__(self, frame_count, page_size=4, tlb_size=16, replacement="LRU"):
+        super().__init__()
+        if frame_count <= 0:
+            raise ValueError("Frame count must be positive")
+        if replacement not in POLICY_CLASSES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        self.frame_count = frame_count
+        self.page_size = page_size
+        self.tlb_size = tlb_size
+        self.replacement = replacement
+        self.policy = POLICY_CLASSES[replacement](frame_count)
+
+        self.page_tables = {}  # process ID -> array of frames
+        self.frame_owners = array("q", [0]) * frame_count
+        self.frame_pages = array("q", [0]) * frame_count
+        self.free_frames = list(range(frame_count - 1, -1, -1))
+        self.tlb = OrderedDict()  # (process ID, page) -> frame
+
+        self.counts = {"Accesses": 0, "TLB Hits": 0, "Page Faults": 0, "Evictions": 0}
+
+    def allocate(self, process_size, priority=1, algorithm=None, name=None, process_id=None):
+        # Creates the process and its (empty) page table; algorithm is
+        # accepted for compatibility with the other models and ignored,
+        # since any frame can hold any page
+        if process_size <= 0:
+            raise ValueError("Process size must be positive")
+        self.check_process_id(process_id)
+        process_id = self.add_process(process_size, priority, name, process_id)
+        pages = -(-process_size // self.page_size)
+        self.page_tables[process_id] = array("q", [-1]) * pages
+        self.notify("processes")
+        return process_id
+
+    def deallocate(self, process_id):
+        table = self.page_tables.pop(process_id, None)
+        if table is None:
+            return False
+        for page, frame in enumerate(table):
+            if frame >= 0:
+                self.policy.remove(frame)
+                self.free_frames.append(frame)
+                self.tlb.pop((process_id, page), None)
+        self.remove_process(process_id)
+        self.notify("processes")
+        return True
+
+    def load(self, process_id, page):
+        # Puts a page into a free frame, evicting one if there is none
+        if self.free_frames:
+            frame = self.free_frames.pop()
+        else:
+            frame = self.policy.victim()
+            owner, owner_page = self.frame_owners[frame], self.frame_pages[frame]
+            self.page_tables[owner][owner_page] = -1
+            self.tlb.pop((owner, owner_page), None)
+            self.counts["Evictions"] += 1
+        self.frame_owners[frame] = process_id
+        self.frame_pages[frame] = page
+        self.page_tables[process_id][page] = frame
+        self.policy.insert(frame)
+        return frame
+
+    def access(self, process_id, page):
+        # Returns the frame holding the page, loading it on a page fault
+        table = self.page_tables.get(process_id)
+        if table is None:
+            raise ValueError(f"Unknown process: P{process_id}")
+        if not 0 <= page < len(table):
+            raise ValueError(f"Page {page} is outside P{process_id}, which has {len(table)} pages")
+        counts = self.counts
+        counts["Accesses"] += 1
+        key = (process_id, page)
+        tlb = self.tlb
+        frame = tlb.get(key)
+        if frame is not None:
+            counts["TLB Hits"] += 1
+            tlb.move_to_end(key)
+            self.policy.touch(frame)
+            return frame
+
+        frame = table[page]
+        if frame < 0:
+            counts["Page Faults"] += 1
+            frame = self.load(process_id, page)
+        else:
+            self.policy.touch(frame)
+        tlb[key] = frame
+        if len(tlb) > self.tlb_size:
+            tlb.popitem(last=False)
+        return frame
+
+    def translate(self, process_id, address):
+        # Physical address (in KB) of a virtual address (in KB)
+        page, offset = divmod(address, self.page_size)
+        return self.access(process_id, page) * self.page_size + offset
+
+    def replay(self, accesses):
+        # Runs a stream of (process ID, page) accesses and returns statistics()
+        # for the stream alone, with its accesses per second
+        before = dict(self.counts)
+        access = self.access
+        start = time.perf_counter()
+        for process_id, page in accesses:
+            access(process_id, page)
+        elapsed = time.perf_counter() - start
+        counts = {key: self.counts[key] - before[key] for key in self.counts}
+        stats = self.statistics(counts)
+        stats["Accesses/s"] = counts["Accesses"] / elapsed if elapsed > 0 else float("inf")
+        return stats
+
+    def resident_pages(self, process_id):
+        return sum(1 for frame in self.page_tables[process_id] if frame >= 0)
+
+    def total_memory(self):
+        return self.frame_count * self.page_size
+
+    def free_memory(self):
+        return len(self.free_frames) * self.page_size
+
+    def used_memory(self):
+        return self.total_memory() - self.free_memory()
+
+    def statistics(self, counts=None):
+        counts = self.counts if counts is None else counts
+        accesses = counts["Accesses"]
+        stats = dict(counts)
+        stats.update({
+            "Total": self.total_memory(), "Used": self.used_memory(), "Free": self.free_memory(),
+            "Replacement": self.replacement,
+            "TLB Hit Ratio": counts["TLB Hits"] / accesses if accesses else 0.0,
+            "Fault Rate": counts["Page Faults"] / accesses if accesses else 0.0,
+        })
+        return stats
+
+
+def generate_accesses(page_counts, count, seed=0, locality=0.9, working_set=8, switch_probability=0.01):
+    # Synthetic access stream over processes with the given page counts
+    # (process ID -> pages): each process works on a window of working_set
+    # pages, touching it with probability locality and a random page
+    # otherwise; the window drifts, and the running process changes with
+    # switch_probability per access
+    rng = random.Random(seed)
+    process_ids = list(page_counts)
+    windows = {process_id: 0 for process_id in process_ids}
+    process_id = rng.choice(process_ids)
+    for _ in range(count):
+        if rng.random() < switch_probability:
+            process_id = rng.choice(process_ids)
+        pages = page_counts[process_id]
+        if rng.random() < locality:
+            base = windows[process_id]
+            page = (base + rng.randrange(min(working_set, pages))) % pages
+            if rng.random() < 0.05:
+                windows[process_id] = (base + 1) % pages
+        else:
+            page = rng.randrange(pages)
+        yield process_id, page
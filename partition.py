@@ -0,0 +1,274 @@
+from allocator import ProcessTable, external_fragmentation
+from compaction import plan_compaction
+from free_index import SortedFreeIndex
+
+ALGORITHMS = ("First Fit", "Best Fit", "Worst Fit", "Next Fit")
+
+
+class Segment:
+    # One contiguous run of memory, either a hole (process_id None) or held by
+    # a process. Segments form a doubly linked list in address order.
+    __slots__ = ("start", "size", "process_id", "prev", "next")
+
+    def __init__(self, start, size, process_id=None, prev=None, next=None):
+        self.start = start
+        self.size = size
+        self.process_id = process_id
+        self.prev = prev
+        self.next = next
+
+    @property
+    def end(self):
+        return self.start + self.size
+
+
+class VariablePartitionAllocator(ProcessTable):
+    # Contiguous address space of total_memory KB. An allocation takes the
+    # front of a hole and leaves the rest of it as a smaller hole; freeing a
+    # segment merges it with a free neighbour on either side through the
+    # segment links, so holes never sit next to each other.
+    #
+    # Holes are also indexed by (size, start) so Best Fit and Worst Fit are
+    # lookups; First Fit and Next Fit walk the segments in address order.
+    def __init__(self, total_memory):
+        super().__init__()
+        if total_memory <= 0:
+            raise ValueError("Memory size must be positive")
+        self.memory_size = total_memory
+        self.head = Segment(0, total_memory)
+        self.holes = {0: self.head}  # hole start -> segment
+        self.free_index = SortedFreeIndex([(total_memory, 0)])
+        self.segments = {}  # process ID -> segment
+        self.free_units = total_memory
+        self.next_fit_segment = self.head
+
+    def __iter__(self):
+        segment = self.head
+        while segment is not None:
+            yield segment
+            segment = segment.next
+
+    def add_hole(self, segment):
+        self.holes[segment.start] = segment
+        self.free_index.add(segment.size, segment.start)
+
+    def remove_hole(self, segment):
+        del self.holes[segment.start]
+        self.free_index.remove(segment.size, segment.start)
+
+    def unlink(self, segment):
+        if segment.prev is not None:
+            segment.prev.next = segment.next
+        else:
+            self.head = segment.next
+        if segment.next is not None:
+            segment.next.prev = segment.prev
+        if self.next_fit_segment is segment:
+            self.next_fit_segment = segment.next or self.head
+
+    # Placement searches return the chosen hole, or None when nothing fits
+
+    def first_fit(self, process_size, start=None):
+        segment = start or self.head
+        while segment is not None:
+            if segment.process_id is None and segment.size >= process_size:
+                return segment
+            segment = segment.next
+        return None
+
+    def best_fit(self, process_size):
+        entry = self.free_index.ceiling(process_size)
+        return self.holes[entry[1]] if entry is not None else None
+
+    def worst_fit(self, process_size):
+        entry = self.free_index.largest()
+        return self.holes[entry[1]] if entry is not None and entry[0] >= process_size else None
+
+    def next_fit(self, process_size):
+        start = self.next_fit_segment
+        hole = self.first_fit(process_size, start)
+        if hole is None and start is not self.head:
+            # Wrap around to the part of memory before the roving position
+            segment = self.head
+            while segment is not start:
+                if segment.process_id is None and segment.size >= process_size:
+                    return segment
+                segment = segment.next
+        return hole
+
+    def find_hole(self, process_size, algorithm="First Fit"):
+        if algorithm == "First Fit":
+            return self.first_fit(process_size)
+        elif algorithm == "Best Fit":
+            return self.best_fit(process_size)
+        elif algorithm == "Worst Fit":
+            return self.worst_fit(process_size)
+        elif algorithm == "Next Fit":
+            return self.next_fit(process_size)
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    def allocate(self, process_size, priority=1, algorithm="First Fit", name=None, process_id=None):
+        # Returns the process ID, or None when no hole can hold the process
+        if process_size <= 0:
+            raise ValueError("Process size must be positive")
+        self.check_process_id(process_id)
+        hole = self.find_hole(process_size, algorithm)
+        if hole is None:
+            return None
+
+        process_id = self.add_process(process_size, priority, name, process_id)
+        self.take_hole(hole, process_id, process_size, algorithm)
+        self.notify("processes")
+        return process_id
+
+    def take_hole(self, hole, process_id, process_size, algorithm):
+        self.remove_hole(hole)
+        if hole.size > process_size:
+            # Split: the process takes the front, the remainder stays free
+            rest = Segment(hole.start + process_size, hole.size - process_size, None, hole, hole.next)
+            if hole.next is not None:
+                hole.next.prev = rest
+            hole.next = rest
+            hole.size = process_size
+            self.add_hole(rest)
+        hole.process_id = process_id
+        self.segments[process_id] = hole
+        self.free_units -= process_size
+        if algorithm == "Next Fit":
+            self.next_fit_segment = hole.next or self.head
+        self.notify("segment", hole.start)
+
+    def place(self, process_id, algorithm="First Fit"):
+        # Finds memory again for a process that is in the table but holds
+        # none, e.g. one swapped out; False when no hole fits
+        process = self.get_process(process_id)
+        if process is None or self.holds_memory(process_id):
+            return False
+        hole = self.find_hole(process.size, algorithm)
+        if hole is None:
+            return False
+        self.take_hole(hole, process_id, process.size, algorithm)
+        self.notify("processes")
+        return True
+
+    def release(self, process_id):
+        # Frees the segment a process holds but keeps it in the table
+        segment = self.segments.pop(process_id, None)
+        if segment is None:
+            return False
+        self.free_units += segment.size
+        segment.process_id = None
+
+        # Coalesce with free neighbours
+        after = segment.next
+        if after is not None and after.process_id is None:
+            self.remove_hole(after)
+            segment.size += after.size
+            self.unlink(after)
+        before = segment.prev
+        if before is not None and before.process_id is None:
+            self.remove_hole(before)
+            before.size += segment.size
+            self.unlink(segment)
+            segment = before
+        self.add_hole(segment)
+        self.notify("segment", segment.start)
+        return True
+
+    def deallocate(self, process_id):
+        if not self.release(process_id):
+            return False
+        self.remove_process(process_id)
+        self.notify("processes")
+        return True
+
+    def defragment(self, process_size=None):
+        # Slides processes down over the holes between them, in one pass over
+        # the segments. Without process_size every process from the first
+        # hole on moves, leaving one hole at the top of memory; with it only
+        # the cheapest run of segments whose holes add up to process_size is
+        # compacted, and nothing moves if a large enough hole already exists.
+        #
+        # Returns {"Moved": KB copied, "Relocations": segments moved,
+        # "Satisfied": whether a large enough hole now exists}.
+        if process_size is not None and self.best_fit(process_size) is not None:
+            return {"Moved": 0, "Relocations": 0, "Satisfied": True}
+
+        segments = list(self)
+        is_free = [segment.process_id is None for segment in segments]
+        sizes = [segment.size for segment in segments]
+        used = [0 if is_free[i] else sizes[i] for i in range(len(segments))]
+        plan = plan_compaction(is_free, sizes, used, process_size)
+        if plan is None:
+            return {"Moved": 0, "Relocations": 0, "Satisfied": process_size is None}
+        first, last, _ = plan
+
+        address = segments[first].start
+        end = segments[last].end
+        previous = segments[first].prev
+        moved = relocations = 0
+        for segment in segments[first:last+1]:
+            if segment.process_id is None:
+                self.remove_hole(segment)
+                self.unlink(segment)
+            else:
+                if segment.start != address:
+                    moved += segment.size
+                    relocations += 1
+                segment.start = address
+                address += segment.size
+                previous = segment
+
+        # One hole for the freed space, right after the last process moved
+        following = previous.next if previous is not None else self.head
+        hole = Segment(address, end - address, None, previous, following)
+        if previous is not None:
+            previous.next = hole
+        else:
+            self.head = hole
+        if following is not None:
+            following.prev = hole
+        self.add_hole(hole)
+
+        self.notify("segment", segments[first].start)
+        return {"Moved": moved, "Relocations": relocations, "Satisfied": True}
+
+    def segment_of(self, process_id):
+        # (start, size) of the segment held by a process, or None
+        segment = self.segments.get(process_id)
+        return (segment.start, segment.size) if segment is not None else None
+
+    def holds_memory(self, process_id):
+        return process_id in self.segments
+
+    def room_if_freed(self, process_id):
+        # Size of the hole deallocating the process would leave, after
+        # merging with free neighbours
+        segment = self.segments[process_id]
+        room = segment.size
+        for neighbour in (segment.prev, segment.next):
+            if neighbour is not None and neighbour.process_id is None:
+                room += neighbour.size
+        return room
+
+    def total_memory(self):
+        return self.memory_size
+
+    def free_memory(self):
+        return self.free_units
+
+    def used_memory(self):
+        return self.memory_size - self.free_units
+
+    def largest_free_block(self):
+        entry = self.free_index.largest()
+        return entry[0] if entry is not None else 0
+
+    def external_fragmentation(self):
+        return external_fragmentation(self.largest_free_block(), self.free_units)
+
+    def statistics(self):
+        largest_free = self.largest_free_block()
+        return {"Total": self.total_memory(), "Used": self.used_memory(), "Free": self.free_memory(),
+                "Holes": len(self.holes), "Largest Free": largest_free,
+                "External Fragmentation": external_fragmentation(largest_free, self.free_units)}
@@ -0,0 +1,83 @@
+import time
+
+
+class RefreshScheduler:
+    # Coalesces GUI updates: model changes only mark what they affect as
+    # dirty, and one callback, run when Tk is next idle (at most once per
+    # frame), redraws what was marked. A burst of allocations from a batch or
+    # script costs one redraw instead of one per operation, and each label is
+    # only reconfigured if its text actually changed.
+    #
+    # Labels are registered with a function producing their text; block map
+    # rows are marked by block index.
+    def __init__(self, widget, block_map=None, frame_ms=16):
+        self.widget = widget
+        self.block_map = block_map
+        self.frame_ms = frame_ms
+        self.labels = {}  # name -> (label, text function)
+        self.texts = {}  # name -> text last shown
+        self.dirty = set()  # label names
+        self.dirty_blocks = set()
+        self.layout_dirty = False
+        self.view_dirty = False
+        self.pending = None
+        self.last_flush = -frame_ms
+
+    def add_label(self, name, label, text):
+        self.labels[name] = (label, text)
+        self.mark(name)
+
+    def schedule(self):
+        if self.pending is None:
+            self.pending = self.widget.after_idle(self.flush)
+
+    def mark(self, *names):
+        self.dirty.update(names)
+        self.schedule()
+
+    def mark_block(self, index):
+        self.dirty_blocks.add(index)
+        self.schedule()
+
+    def mark_layout(self):
+        # Block count changed: the whole map is rebuilt, so single blocks
+        # need not be tracked until then
+        self.layout_dirty = True
+        self.dirty_blocks.clear()
+        self.schedule()
+
+    def mark_view(self):
+        # Every block in view may read differently (e.g. priorities shown)
+        self.view_dirty = True
+        self.schedule()
+
+    def flush(self):
+        # Keeps to one redraw per frame: if the last one was under frame_ms
+        # ago, waits out the rest of the frame first
+        now = time.monotonic() * 1000
+        wait = int(self.last_flush + self.frame_ms - now)
+        if wait > 0:
+            self.pending = self.widget.after(wait, self.flush)
+            return
+        self.pending = None
+        self.last_flush = now
+
+        if self.block_map is not None:
+            if self.layout_dirty:
+                self.block_map.refresh()
+            else:
+                for index in self.dirty_blocks:
+                    self.block_map.update_block(index)
+                if self.view_dirty:
+                    self.block_map.redraw()
+        self.layout_dirty = self.view_dirty = False
+        self.dirty_blocks.clear()
+
+        dirty, self.dirty = self.dirty, set()
+        for name in dirty:
+            label, text = self.labels[name]
+            value = text()
+            if self.texts.get(name) != value:
+                self.texts[name] = value
+                label.config(text=value)
+
@@ -0,0 +1,98 @@
+from heapq import heappop, heappush
+
+
+class PriorityScheduler:
+    # Binary min-heap of (key, item) pairs with each item's slot kept in
+    # position, so push, remove and change_key are all O(log n) sifts and
+    # nothing is left behind as a stale entry. Keys must be unique (the
+    # process table adds an arrival number) so items are never compared.
+    def __init__(self):
+        self.heap = []
+        self.position = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def __iter__(self):
+        # Items in key order without disturbing the heap: a second, small heap
+        # holds the frontier of slots not yet visited, so the first k items
+        # cost O(k log k). The scheduler must not change while iterating.
+        heap = self.heap
+        if not heap:
+            return
+        frontier = [(heap[0][0], 0)]
+        while frontier:
+            _, i = heappop(frontier)
+            yield heap[i][1]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heappush(frontier, (heap[child][0], child))
+
+    def key_of(self, item):
+        return self.heap[self.position[item]][0]
+
+    def peek(self):
+        # Item with the smallest key, or None when empty
+        return self.heap[0][1] if self.heap else None
+
+    def push(self, item, key):
+        if item in self.position:
+            raise ValueError(f"{item!r} is already scheduled")
+        self.heap.append((key, item))
+        self.position[item] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        item = self.heap[0][1]
+        self.remove(item)
+        return item
+
+    def remove(self, item):
+        i = self.position.pop(item)
+        last = self.heap.pop()
+        if i < len(self.heap):
+            # Fill the hole with the last entry and move it to where it belongs
+            self.heap[i] = last
+            self.position[last[1]] = i
+            self.sift_down(self.sift_up(i))
+
+    def change_key(self, item, key):
+        i = self.position[item]
+        self.heap[i] = (key, item)
+        self.sift_down(self.sift_up(i))
+
+    def sift_up(self, i):
+        heap, position = self.heap, self.position
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][1]] = i
+            i = parent
+        heap[i] = entry
+        position[entry[1]] = i
+        return i
+
+    def sift_down(self, i):
+        heap, position = self.heap, self.position
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[i] = heap[child]
+            position[heap[i][1]] = i
+            i = child
+        heap[i] = entry
+        position[entry[1]] = i
+        return i
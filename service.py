@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+from allocator import ALGORITHMS, Allocator
+from benchmark import percentile
+from tables import MAX_VALUE
+
+# Wire format: one JSON object per line in each direction. Requests carry an
+# "id" chosen by the client, echoed in the response, so a client can send
+# many requests without waiting (pipelining) and match the answers up:
+#   {"id": 1, "op": "allocate", "size": 100, "priority": 1, "name": "a"}
+#   {"id": 1, "ok": true, "process_id": 7}
+#   {"id": 2, "op": "free", "process_id": 7}
+#   {"id": 2, "ok": true}
+#   {"id": 3, "op": "stats"}
+#   {"id": 3, "ok": true, "stats": {...}}
+# A request that fails gets {"id": ..., "ok": false, "error": "..."}.
+
+LATENCY_WINDOW = 100000  # Latest requests kept for the percentiles
+
+
+def integer_field(request, key, default=None):
+    # A whole number from the request, within what the allocator can store
+    value = int(request[key] if default is None else request.get(key, default))
+    if not -MAX_VALUE - 1 <= value <= MAX_VALUE:
+        raise ValueError(f"{key} out of range: {value}")
+    return value
+
+
+class AllocationServer:
+    # Serves one shared allocator to any number of connections. Requests are
+    # not handled as they are read: they are queued, and one callback per
+    # event loop iteration handles everything that arrived in it (a batch),
+    # so the allocator only ever runs on the loop thread and never needs a
+    # lock. Latency is measured from reading a request to queuing its
+    # response.
+    def __init__(self, allocator, algorithm="First Fit"):
+        self.allocator = allocator
+        self.algorithm = algorithm
+        self.pending = []  # (request, writer, time read)
+        self.scheduled = False
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # ns
+        self.counts = {"Requests": 0, "Errors": 0, "Batches": 0, "Connections": 0}
+        self.largest_batch = 0
+
+    async def handle_connection(self, reader, writer):
+        self.counts["Connections"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.pending.append((line, writer, time.perf_counter_ns()))
+                if not self.scheduled:
+                    self.scheduled = True
+                    loop.call_soon(self.run_batch)
+                # Stops reading from a client that is not reading its responses
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def run_batch(self):
+        batch, self.pending = self.pending, []
+        self.scheduled = False
+        self.counts["Batches"] += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for line, writer, received in batch:
+            response = self.handle(line)
+            if not writer.is_closing():
+                writer.write(json.dumps(response).encode() + b"\n")
+            self.latencies.append(time.perf_counter_ns() - received)
+
+    def handle(self, line):
+        self.counts["Requests"] += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request["op"]
+            if op == "allocate":
+                process_id = self.allocator.allocate(integer_field(request, "size"), integer_field(request, "priority", 1),
+                                                     request.get("algorithm", self.algorithm), request.get("name"))
+                if process_id is None:
+                    raise ValueError(f"No suitable block found for process size {request['size']}KB")
+                return {"id": request_id, "ok": True, "process_id": process_id}
+            if op == "free":
+                if not self.allocator.deallocate(integer_field(request, "process_id")):
+                    raise ValueError(f"Process P{request['process_id']} not found")
+                return {"id": request_id, "ok": True}
+            if op == "stats":
+                return {"id": request_id, "ok": True, "stats": self.statistics()}
+            raise ValueError(f"Unknown operation: {op}")
+        except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+            self.counts["Errors"] += 1
+            return {"id": request_id, "ok": False, "error": str(e) if not isinstance(e, KeyError) else f"Missing {e}"}
+        except Exception as e:
+            # Anything else is a server bug, but it fails only this request:
+            # the rest of the batch is still answered
+            self.counts["Errors"] += 1
+            return {"id": request_id, "ok": False, "error": f"Internal error: {e!r}"}
+
+    def statistics(self):
+        latencies = sorted(self.latencies)
+        stats = self.allocator.statistics()
+        stats.update(self.counts)
+        stats.update({
+            "Processes": len(self.allocator.process_rows),
+            "Mean Batch": self.counts["Requests"] / self.counts["Batches"] if self.counts["Batches"] else 0.0,
+            "Largest Batch": self.largest_batch,
+            "P50 ns": percentile(latencies, 0.50),
+            "P90 ns": percentile(latencies, 0.90),
+            "P99 ns": percentile(latencies, 0.99),
+            "Max ns": latencies[-1] if latencies else 0,
+        })
+        return stats
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        # Listens on a Unix socket if a path is given, otherwise on TCP
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+class RequestError(Exception):
+    pass
+
+
+class AllocationClient:
+    # Client for AllocationServer. Every call sends its request at once and
+    # returns when its response arrives, so calls made concurrently (e.g.
+    # with asyncio.gather) are pipelined over the one connection.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}  # request ID -> future
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the allocation server closed"))
+            self.waiting.clear()
+
+    async def request(self, op, **fields):
+        if self.receiver.done():
+            raise ConnectionError("Connection to the allocation server closed")
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[self.next_id] = future
+        self.writer.write(json.dumps({"id": self.next_id, "op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        response = await future
+        if not response["ok"]:
+            raise RequestError(response["error"])
+        return response
+
+    async def allocate(self, size, priority=1, algorithm=None, name=None):
+        fields = {"size": size, "priority": priority}
+        if algorithm is not None:
+            fields["algorithm"] = algorithm
+        if name is not None:
+            fields["name"] = name
+        return (await self.request("allocate", **fields))["process_id"]
+
+    async def free(self, process_id):
+        await self.request("free", process_id=process_id)
+
+    async def stats(self):
+        return (await self.request("stats"))["stats"]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+async def run_client(client, requests, pipeline, max_size, seed, latencies):
+    # One simulated requester: keeps up to pipeline requests in flight,
+    # allocating and freeing its own processes at random
+    rng = random.Random(seed)
+    owned = []
+
+    async def one():
+        began = time.perf_counter_ns()
+        try:
+            if owned and rng.random() < 0.5:
+                await client.free(owned.pop(rng.randrange(len(owned))))
+            else:
+                owned.append(await client.allocate(rng.randint(1, max_size)))
+        except RequestError:
+            pass  # Out of memory; counts as a served request all the same
+        latencies.append(time.perf_counter_ns() - began)
+
+    async def worker(count):
+        for _ in range(count):
+            await one()
+
+    share, extra = divmod(requests, pipeline)
+    await asyncio.gather(*(worker(share + (i < extra)) for i in range(pipeline)))
+
+
+async def load_test(path=None, host="127.0.0.1", port=None, clients=50, requests=1000, pipeline=4, max_size=100,
+                    seed=0):
+    # Runs clients concurrent requesters against a server and returns the
+    # throughput and the end-to-end latency percentiles they saw
+    connections = [await AllocationClient.connect(path, host, port) for _ in range(clients)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(c, requests, pipeline, max_size, seed + i, latencies)
+                           for i, c in enumerate(connections)))
+    elapsed = time.perf_counter() - start
+    server_stats = await connections[0].stats()
+    for client in connections:
+        await client.close()
+    latencies.sort()
+    return {
+        "Clients": clients, "Requests": len(latencies), "Pipeline": pipeline,
+        "Requests/s": len(latencies) / elapsed if elapsed > 0 else float("inf"),
+        "P50 ns": percentile(latencies, 0.50), "P90 ns": percentile(latencies, 0.90),
+        "P99 ns": percentile(latencies, 0.99), "Max ns": latencies[-1] if latencies else 0,
+        "Server": server_stats,
+    }
+
+
+def format_load(report):
+    server = report["Server"]
+    return (f"{report['Clients']} clients x {report['Pipeline']} in flight: {report['Requests']} requests, "
+            f"{report['Requests/s']:,.0f} req/s\n"
+            f"client p50 {report['P50 ns'] / 1000:,.0f} us  p90 {report['P90 ns'] / 1000:,.0f} us  "
+            f"p99 {report['P99 ns'] / 1000:,.0f} us  max {report['Max ns'] / 1000:,.0f} us\n"
+            f"server p50 {server['P50 ns'] / 1000:,.0f} us  p99 {server['P99 ns'] / 1000:,.0f} us  "
+            f"mean batch {server['Mean Batch']:.1f}  largest batch {server['Largest Batch']}")
+
+
+async def serve(args):
+    server = AllocationServer(Allocator(args.blocks), args.algorithm)
+    listener = await server.start(args.socket, args.host, args.port)
+    address = args.socket or "%s:%d" % listener.sockets[0].getsockname()[:2]
+    print(f"Serving {len(args.blocks)} blocks on {address}")
+    async with listener:
+        await listener.serve_forever()
+
+
+async def load(args):
+    # Without a server address, runs a server in this process to load
+    if args.socket is None and args.port == 0:
+        server = AllocationServer(Allocator(args.blocks), args.algorithm)
+        listener = await server.start(host=args.host)
+        port = listener.sockets[0].getsockname()[1]
+    else:
+        listener, port = None, args.port
+    report = await load_test(args.socket, args.host, port, args.clients, args.requests, args.pipeline,
+                             args.max_size, args.seed)
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+    print(format_load(report))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Allocation service over a local socket")
+    parser.add_argument("command", choices=("serve", "load"))
+    parser.add_argument("--socket", help="Unix socket path (default: TCP on --host/--port)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[1000] * 1000)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="First Fit")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per client")
+    parser.add_argument("--pipeline", type=int, default=4, help="requests each client keeps in flight")
+    parser.add_argument("--max-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args) if args.command == "serve" else load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import random
+import time
+from collections import deque
+from heapq import heappop, heappush
+
+from scheduler import PriorityScheduler
+from trace_replay import random_size
+
+
+class Simulation:
+    # Discrete-event simulation of processes running on top of an allocator
+    # (Allocator or VariablePartitionAllocator). Simulated time jumps from
+    # one event to the next on a heap of (time, sequence, kind, process ID),
+    # so it runs as fast as the events can be processed.
+    #
+    # Processes arrive at random (Poisson, arrival_rate per second), each
+    # with a size, a priority and a total CPU demand. An arriving process is
+    # allocated memory at once or joins a FIFO admission queue until
+    # completions free enough memory; the head of the queue is retried first,
+    # so a large process is never starved by smaller ones behind it (one that
+    # does not fit even into empty memory is rejected). Admitted
+    # processes wait in a ready queue (highest priority first) for one of the
+    # CPUs and run in bursts. After a burst a process either completes and
+    # frees its memory, is suspended for a while (keeping its memory) and
+    # resumed later, or goes back to the ready queue.
+    def __init__(self, allocator, algorithm="First Fit", seed=0, arrival_rate=10.0, size_distribution="uniform",
+                 max_size=500, mean_cpu_time=0.5, mean_burst=0.05, cpus=1, suspend_probability=0.05,
+                 mean_suspend_time=0.2, sample_interval=1.0):
+        self.allocator = allocator
+        self.algorithm = algorithm
+        self.rng = random.Random(seed)
+        self.arrival_rate = arrival_rate
+        self.size_distribution = size_distribution
+        self.max_size = max_size
+        self.mean_cpu_time = mean_cpu_time
+        self.mean_burst = mean_burst
+        self.cpus = cpus
+        self.suspend_probability = suspend_probability
+        self.mean_suspend_time = mean_suspend_time
+        self.sample_interval = sample_interval
+
+        self.now = 0.0
+        self.events = []
+        self.sequence = 0
+        self.next_process_id = 1
+
+        self.idle_cpus = cpus
+        self.ready = PriorityScheduler()
+        self.admission_queue = deque()  # (process ID, size, priority, arrival time)
+        self.remaining = {}  # process ID -> CPU time still needed
+        self.arrival_times = {}
+        self.ready_since = {}
+        self.bursts = {}  # process ID -> length of the burst it is running
+
+        self.counts = {"Arrivals": 0, "Admitted": 0, "Queued For Memory": 0, "Rejected": 0,
+                       "Completions": 0, "Suspends": 0, "Resumes": 0, "Events": 0}
+        self.admission_wait = 0.0
+        self.max_admission_wait = 0.0
+        self.ready_wait = 0.0
+        self.ready_waits = 0
+        self.max_ready_wait = 0.0
+        self.turnaround = 0.0
+
+        # Time integrals for the averages, and the utilization samples
+        self.memory_area = 0.0
+        self.cpu_area = 0.0
+        self.peak_utilization = 0.0
+        self.samples = []  # (time, memory utilization, ready, waiting for memory)
+        self.next_sample = 0.0
+
+        self.schedule(self.rng.expovariate(arrival_rate), "arrival", 0)
+
+    def schedule(self, at, kind, process_id):
+        heappush(self.events, (at, self.sequence, kind, process_id))
+        self.sequence += 1
+
+    def utilization(self):
+        total = self.allocator.total_memory()
+        return self.allocator.used_memory() / total if total else 0.0
+
+    def advance(self, to):
+        # Moves the clock forward, accumulating the time averages; nothing
+        # changes between events, so the state now holds for the whole span
+        span = to - self.now
+        if span <= 0:
+            return
+        utilization = self.utilization()
+        while self.next_sample <= to:
+            self.samples.append((self.next_sample, utilization, len(self.ready), len(self.admission_queue)))
+            self.next_sample += self.sample_interval
+        self.peak_utilization = max(self.peak_utilization, utilization)
+        self.memory_area += utilization * span
+        self.cpu_area += (self.cpus - self.idle_cpus) * span
+        self.now = to
+
+    def make_ready(self, process_id, priority):
+        self.ready_since[process_id] = self.now
+        self.ready.push(process_id, (-priority, self.sequence))
+        self.sequence += 1
+
+    def admit(self, process_id, size, priority, arrival_time):
+        if self.allocator.allocate(size, priority, self.algorithm, process_id=process_id) is None:
+            return False
+        wait = self.now - arrival_time
+        self.admission_wait += wait
+        self.max_admission_wait = max(self.max_admission_wait, wait)
+        self.counts["Admitted"] += 1
+        self.make_ready(process_id, priority)
+        return True
+
+    def reject(self, process_id):
+        del self.remaining[process_id]
+        del self.arrival_times[process_id]
+        self.counts["Rejected"] += 1
+
+    def admit_waiting(self):
+        queue = self.admission_queue
+        while queue:
+            if self.admit(*queue[0]):
+                queue.popleft()
+            elif self.allocator.used_memory() == 0:
+                self.reject(queue.popleft()[0])
+            else:
+                break
+
+    def dispatch(self):
+        while self.idle_cpus and len(self.ready):
+            process_id = self.ready.pop()
+            wait = self.now - self.ready_since.pop(process_id)
+            self.ready_wait += wait
+            self.ready_waits += 1
+            self.max_ready_wait = max(self.max_ready_wait, wait)
+
+            burst = min(self.remaining[process_id], self.rng.expovariate(1 / self.mean_burst))
+            self.bursts[process_id] = burst
+            self.idle_cpus -= 1
+            self.schedule(self.now + burst, "burst", process_id)
+
+    def on_arrival(self):
+        process_id = self.next_process_id
+        self.next_process_id += 1
+        size = random_size(self.rng, self.size_distribution, self.max_size)
+        priority = self.rng.randint(1, 10)
+        self.counts["Arrivals"] += 1
+        self.remaining[process_id] = self.rng.expovariate(1 / self.mean_cpu_time)
+        self.arrival_times[process_id] = self.now
+
+        # Queue behind earlier arrivals that are still waiting for memory
+        if self.admission_queue or not self.admit(process_id, size, priority, self.now):
+            if not self.admission_queue and self.allocator.used_memory() == 0:
+                self.reject(process_id)
+            else:
+                self.counts["Queued For Memory"] += 1
+                self.admission_queue.append((process_id, size, priority, self.now))
+
+        # Scheduled even past the end of this run: it waits in the heap for
+        # the next call to run()
+        self.schedule(self.now + self.rng.expovariate(self.arrival_rate), "arrival", 0)
+
+    def on_burst(self, process_id):
+        self.idle_cpus += 1
+        self.remaining[process_id] -= self.bursts.pop(process_id)
+        if self.remaining[process_id] <= 1e-12:
+            del self.remaining[process_id]
+            self.turnaround += self.now - self.arrival_times.pop(process_id)
+            self.allocator.deallocate(process_id)
+            self.counts["Completions"] += 1
+            self.admit_waiting()
+        elif self.rng.random() < self.suspend_probability:
+            self.allocator.suspend(process_id)
+            self.counts["Suspends"] += 1
+            self.schedule(self.now + self.rng.expovariate(1 / self.mean_suspend_time), "resume", process_id)
+        else:
+            self.make_ready(process_id, self.allocator.priority_of(process_id))
+
+    def on_resume(self, process_id):
+        self.allocator.resume(process_id)
+        self.counts["Resumes"] += 1
+        self.make_ready(process_id, self.allocator.priority_of(process_id))
+
+    def run(self, duration):
+        # Simulates the next duration seconds of simulated time and returns
+        # report(); can be called again to continue
+        until = self.now + duration
+        wall_start = time.perf_counter()
+        events = self.events
+        while events and events[0][0] <= until:
+            at, _, kind, process_id = heappop(events)
+            self.advance(at)
+            self.counts["Events"] += 1
+            if kind == "arrival":
+                self.on_arrival()
+            elif kind == "burst":
+                self.on_burst(process_id)
+            else:
+                self.on_resume(process_id)
+            self.dispatch()
+        self.advance(until)
+        return self.report(time.perf_counter() - wall_start)
+
+    def report(self, elapsed=0.0):
+        counts = self.counts
+        now = self.now
+        admitted = counts["Admitted"]
+        report = dict(counts)
+        report.update({
+            "Simulated Time": now,
+            "Throughput": counts["Completions"] / now if now else 0.0,
+            "Mean Admission Wait": self.admission_wait / admitted if admitted else 0.0,
+            "Max Admission Wait": self.max_admission_wait,
+            "Mean Ready Wait": self.ready_wait / self.ready_waits if self.ready_waits else 0.0,
+            "Max Ready Wait": self.max_ready_wait,
+            "Mean Turnaround": self.turnaround / counts["Completions"] if counts["Completions"] else 0.0,
+            "Mean Memory Utilization": self.memory_area / now if now else 0.0,
+            "Peak Memory Utilization": self.peak_utilization,
+            "CPU Utilization": self.cpu_area / (now * self.cpus) if now else 0.0,
+            "Waiting For Memory": len(self.admission_queue),
+            "Events/s": counts["Events"] / elapsed if elapsed > 0 else float("inf"),
+        })
+        return report
@@ -0,0 +1,201 @@
+import mmap
+import time
+
+from partition import VariablePartitionAllocator
+
+
+def process_image(process_id, size):
+    # Stand-in for a process's memory contents: its ID repeated, so a
+    # swapped-in image can be checked against the process it belongs to
+    return (process_id.to_bytes(8, "little") * (size // 8 + 1))[:size]
+
+
+class SwapManager:
+    # Swapping on top of an allocator (Allocator or VariablePartitionAllocator).
+    # When an allocation fails, victims are swapped out until it succeeds:
+    # suspended processes first, then running processes of lower priority
+    # than the request, lowest priority first. A victim's image is written
+    # to a memory-mapped swap file and its memory is freed, but it stays in
+    # the process table with status "Swapped"; it is swapped back in when
+    # resumed, or when memory is freed again and it fits.
+    #
+    # The swap file holds swap_size units of unit_bytes bytes (process sizes
+    # are in KB, so 1024 by default). Space in it is handed out by a
+    # VariablePartitionAllocator with the process ID as owner. With sync=True
+    # every swap-out is flushed to disk; otherwise the OS writes it back.
+    #
+    # Allocations, frees, suspends and resumes should go through the manager
+    # so it knows which processes are swapped out.
+    def __init__(self, allocator, path, swap_size, unit_bytes=1024, algorithm="First Fit", sync=False):
+        self.allocator = allocator
+        self.path = path
+        self.unit_bytes = unit_bytes
+        self.algorithm = algorithm
+        self.sync = sync
+        self.slots = VariablePartitionAllocator(swap_size)
+        self.swapped = {}  # process ID -> status before it was swapped out
+
+        self.file = open(path, "w+b")
+        self.file.truncate(swap_size * unit_bytes)
+        self.map = mmap.mmap(self.file.fileno(), swap_size * unit_bytes)
+
+        self.counts = {"Swap Outs": 0, "Swap Ins": 0, "Swap Out Bytes": 0, "Swap In Bytes": 0,
+                       "Allocation Failures": 0, "Failures Avoided": 0}
+        self.swap_out_time = 0.0
+        self.swap_in_time = 0.0
+        self.max_latency = 0.0
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def is_swapped(self, process_id):
+        return process_id in self.swapped
+
+    def helps(self, process_id, process_size):
+        # Whether swapping out this process alone leaves a large enough hole
+        return self.allocator.room_if_freed(process_id) >= process_size
+
+    def victims(self, process_size, priority):
+        # Candidates in the order they should be swapped out
+        allocator = self.allocator
+        candidates = []
+        for process_id in allocator.process_rows:
+            if not allocator.holds_memory(process_id):
+                continue
+            process = allocator.get_process(process_id)
+            suspended = process.status == "Suspended"
+            if (suspended or process.priority < priority) and self.helps(process_id, process_size):
+                candidates.append((not suspended, process.priority, process_id))
+        candidates.sort()
+        return [process_id for _, _, process_id in candidates]
+
+    def make_room(self, process_size, priority, allocate):
+        # Swaps out victims until allocate() succeeds; returns its result
+        for victim in self.victims(process_size, priority):
+            if not self.swap_out(victim):
+                continue  # Swap file too full for this one
+            process_id = allocate()
+            if process_id is not None:
+                return process_id
+        return None
+
+    def allocate(self, process_size, priority=1, algorithm="First Fit", name=None, process_id=None):
+        def allocate():
+            return self.allocator.allocate(process_size, priority, algorithm, name, process_id)
+
+        allocated = allocate()
+        if allocated is None:
+            self.counts["Allocation Failures"] += 1
+            allocated = self.make_room(process_size, priority, allocate)
+            if allocated is not None:
+                self.counts["Failures Avoided"] += 1
+        return allocated
+
+    def swap_out(self, process_id):
+        # Only a process that holds memory has anything to swap out
+        process = self.allocator.get_process(process_id)
+        if process is None or not self.allocator.holds_memory(process_id):
+            return False
+        if self.slots.allocate(process.size, process_id=process_id) is None:
+            return False
+        start, size = self.slots.segment_of(process_id)
+        offset = start * self.unit_bytes
+        nbytes = size * self.unit_bytes
+
+        began = time.perf_counter()
+        self.map[offset:offset+nbytes] = process_image(process_id, nbytes)
+        if self.sync:
+            self.map.flush()
+        latency = time.perf_counter() - began
+
+        self.swapped[process_id] = process.status
+        self.allocator.release(process_id)
+        self.allocator.set_status(process_id, "Swapped")
+        self.counts["Swap Outs"] += 1
+        self.counts["Swap Out Bytes"] += nbytes
+        self.swap_out_time += latency
+        self.max_latency = max(self.max_latency, latency)
+        return True
+
+    def swap_in(self, process_id, evict=True):
+        # Brings a process back into memory, swapping out lower priority
+        # ones if evict is set and it does not fit; it comes back Running
+        if process_id not in self.swapped:
+            return False
+        process = self.allocator.get_process(process_id)
+
+        def allocate():
+            return process_id if self.allocator.place(process_id, self.algorithm) else None
+
+        if allocate() is None and (not evict or self.make_room(process.size, process.priority, allocate) is None):
+            return False
+
+        start, size = self.slots.segment_of(process_id)
+        offset = start * self.unit_bytes
+        nbytes = size * self.unit_bytes
+        began = time.perf_counter()
+        image = self.map[offset:offset+nbytes]
+        latency = time.perf_counter() - began
+        if image[:8] != process_id.to_bytes(8, "little")[:nbytes]:
+            raise RuntimeError(f"Swap image of process {process_id} is corrupt")
+
+        self.slots.deallocate(process_id)
+        del self.swapped[process_id]
+        self.allocator.set_status(process_id, "Running")
+        self.counts["Swap Ins"] += 1
+        self.counts["Swap In Bytes"] += nbytes
+        self.swap_in_time += latency
+        self.max_latency = max(self.max_latency, latency)
+        return True
+
+    def refill(self):
+        # After memory is freed, brings back swapped-out processes that were
+        # running, highest priority first, as long as they fit without
+        # evicting anything
+        waiting = sorted((process_id for process_id, status in self.swapped.items() if status == "Running"),
+                         key=self.allocator.priority_of, reverse=True)
+        for process_id in waiting:
+            self.swap_in(process_id, evict=False)
+
+    def deallocate(self, process_id):
+        if process_id in self.swapped:
+            # Gone from swap without ever coming back
+            self.slots.deallocate(process_id)
+            del self.swapped[process_id]
+            self.allocator.remove_process(process_id)
+            self.allocator.notify("processes")
+            return True
+        if not self.allocator.deallocate(process_id):
+            return False
+        self.refill()
+        return True
+
+    def suspend(self, process_id):
+        if process_id in self.swapped:
+            if self.swapped[process_id] != "Running":
+                return False
+            self.swapped[process_id] = "Suspended"
+            return True
+        return self.allocator.suspend(process_id)
+
+    def resume(self, process_id):
+        if process_id in self.swapped:
+            return self.swapped[process_id] == "Suspended" and self.swap_in(process_id)
+        return self.allocator.resume(process_id)
+
+    def statistics(self):
+        counts = self.counts
+        failures = counts["Allocation Failures"]
+        stats = dict(counts)
+        stats.update({
+            "Swapped": len(self.swapped),
+            "Swap Used": self.slots.used_memory(),
+            "Swap Free": self.slots.free_memory(),
+            "Mean Swap Out Latency": self.swap_out_time / counts["Swap Outs"] if counts["Swap Outs"] else 0.0,
+            "Mean Swap In Latency": self.swap_in_time / counts["Swap Ins"] if counts["Swap Ins"] else 0.0,
+            "Max Swap Latency": self.max_latency,
+            # Share of allocation failures that swapping turned into successes
+            "Hit Rate": counts["Failures Avoided"] / failures if failures else 0.0,
+        })
+        return stats
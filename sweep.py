@@ -0,0 +1,133 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Workers only need the headless core; nothing here may import tkinter or
+# matplotlib, so starting a worker stays cheap
+from allocator import ALGORITHMS, Allocator
+from benchmark import make_blocks
+from trace_replay import SIZE_DISTRIBUTIONS, generate_events, replay
+
+SweepConfig = namedtuple("SweepConfig", "algorithm blocks block_distribution seed size_distribution operations")
+
+
+def make_grid(algorithms, block_counts, block_distributions, seeds, size_distributions, operations):
+    return [SweepConfig(*values, operations) for values in
+            itertools.product(algorithms, block_counts, block_distributions, seeds, size_distributions)]
+
+
+def run_config(config):
+    # One sweep run: replays a generated workload on a fresh allocator
+    blocks = make_blocks(config.blocks, config.block_distribution, config.seed)
+    events = generate_events(config.operations, seed=config.seed, size_distribution=config.size_distribution)
+    allocator = Allocator(blocks)
+    summary = next(replay(events, allocator, config.algorithm, interval=float("inf")))
+    return {
+        "Algorithm": config.algorithm,
+        "Blocks": config.blocks,
+        "Block Distribution": config.block_distribution,
+        "Seed": config.seed,
+        "Size Distribution": config.size_distribution,
+        "Operations": config.operations,
+        "Success Rate": summary["Success Rate"],
+        "Failures": summary["Failures"],
+        "External Fragmentation": summary["External Fragmentation"],
+        "Used": summary["Used"],
+        "Free": summary["Free"],
+        "Ops/s": summary["Ops/s"],
+    }
+
+
+def run_sweep(configs, workers=None, progress=None):
+    # Runs every configuration on a pool of worker processes (one per core
+    # by default) and returns the results in configuration order
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(run_config, configs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(workers)
+        # Several runs per task so small runs are not dominated by IPC
+        results = executor.map(run_config, configs, chunksize=max(1, len(configs) // (workers * 8)))
+    try:
+        merged = []
+        for result in results:
+            merged.append(result)
+            if progress is not None:
+                progress(len(merged), len(configs))
+        return merged
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def summarize(results):
+    # Mean of each measure over seeds, one row per remaining combination
+    groups = {}
+    for result in results:
+        key = (result["Algorithm"], result["Blocks"], result["Block Distribution"], result["Size Distribution"])
+        groups.setdefault(key, []).append(result)
+    summary = []
+    for (algorithm, blocks, block_distribution, size_distribution), rows in groups.items():
+        summary.append({
+            "Algorithm": algorithm, "Blocks": blocks, "Block Distribution": block_distribution,
+            "Size Distribution": size_distribution, "Runs": len(rows),
+            "Success Rate": sum(r["Success Rate"] for r in rows) / len(rows),
+            "External Fragmentation": sum(r["External Fragmentation"] for r in rows) / len(rows),
+            "Ops/s": sum(r["Ops/s"] for r in rows) / len(rows),
+        })
+    return summary
+
+
+def save_csv(path, rows):
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def format_table(rows):
+    if not rows:
+        return ""
+    columns = list(rows[0])
+
+    def cell(value):
+        return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+    cells = [[cell(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run allocator parameter sweeps in parallel")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--blocks", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--block-distributions", nargs="+", choices=SIZE_DISTRIBUTIONS, default=list(SIZE_DISTRIBUTIONS))
+    parser.add_argument("--seeds", type=int, default=5, help="number of workload seeds per configuration")
+    parser.add_argument("--size-distributions", nargs="+", choices=SIZE_DISTRIBUTIONS, default=list(SIZE_DISTRIBUTIONS))
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="sweep.csv", help="CSV file for every run")
+    args = parser.parse_args(argv)
+
+    configs = make_grid(args.algorithms, args.blocks, args.block_distributions, range(args.seeds),
+                        args.size_distributions, args.operations)
+    start = time.perf_counter()
+    results = run_sweep(configs, args.workers)
+    elapsed = time.perf_counter() - start
+    save_csv(args.output, results)
+    print(format_table(summarize(results)))
+    print(f"{len(results)} runs in {elapsed:.1f}s, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
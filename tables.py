@@ -0,0 +1,137 @@
+
+# Process status as a small integer, stored one byte per process
+STATUSES = ("Running", "Suspended", "Terminated", "Swapped")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Owner marker for a block that has been turned into a buddy arena and may
+# hold several processes at once
+BUDDY = "Buddy"
+
+MAX_VALUE = 2**63 - 1  # Largest number the allocator's columns can hold
+
+# Owner column codes: process IDs are positive, so these never clash
+NO_OWNER = 0
+BUDDY_OWNER = -1
+
+# Record keys and the ProcessRecord attributes behind them
+FIELDS = {"ID": "id", "Size": "size", "Priority": "priority", "Status": "status",
+          "Name": "name", "StartTime": "start_time"}
+
+
+def status_code(status):
+    code = STATUS_CODES.get(status)
+    if code is None:
+        raise ValueError(f"Unknown process status: {status}")
+    return code
+
+
+def owner_code(process_id):
+    # None, BUDDY or a process ID as stored in an owner column
+    if process_id is None:
+        return NO_OWNER
+    if process_id == BUDDY:
+        return BUDDY_OWNER
+    return process_id
+
+
+class ProcessRecord:
+    # View of one row of a ProcessTable's columns. Supports the record keys
+    # (proc["Size"], proc.get("Name", "")) as well as attributes; reads and
+    # writes go straight to the columns. Only valid while the process exists,
+    # since its row is reused once the process is removed.
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def id(self):
+        return self.table.ids[self.row]
+
+    @property
+    def size(self):
+        return self.table.sizes[self.row]
+
+    @size.setter
+    def size(self, value):
+        self.table.sizes[self.row] = value
+
+    @property
+    def priority(self):
+        return self.table.priorities[self.row] + self.table.aging_offset
+
+    @priority.setter
+    def priority(self, value):
+        self.table.set_priority(self.id, value)
+
+    @property
+    def status(self):
+        return STATUSES[self.table.statuses[self.row]]
+
+    @status.setter
+    def status(self, value):
+        self.table.set_status(self.id, value)
+
+    @property
+    def name(self):
+        return self.table.names.get(self.row)
+
+    @name.setter
+    def name(self, value):
+        self.table.rename(self.id, value)
+
+    @property
+    def start_time(self):
+        return self.table.start_times[self.row]
+
+    @start_time.setter
+    def start_time(self, value):
+        self.table.start_times[self.row] = value
+
+    def __getitem__(self, key):
+        if key == "Name" and self.row not in self.table.names:
+            raise KeyError(key)
+        return getattr(self, FIELDS[key])
+
+    def __setitem__(self, key, value):
+        if key == "ID":
+            raise KeyError("Process IDs cannot be changed")
+        setattr(self, FIELDS[key], value)
+
+    def __contains__(self, key):
+        return key in FIELDS and (key != "Name" or self.row in self.table.names)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def as_dict(self):
+        # Plain dict copy, e.g. for saving to JSON
+        return {key: self[key] for key in FIELDS if key in self}
+
+    def __repr__(self):
+        return f"ProcessRecord({self.as_dict()})"
+
+
+class BlockOwners:
+    # Read-only view of an owner column as the allocator reports owners:
+    # None for a free block, BUDDY for a buddy arena, else the process ID
+    __slots__ = ("owners",)
+
+    def __init__(self, owners):
+        self.owners = owners
+
+    def __len__(self):
+        return len(self.owners)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.owners)))]
+        owner = self.owners[index]
+        if owner > 0:
+            return owner
+        return None if owner == NO_OWNER else BUDDY
+
+    def __iter__(self):
+        for owner in self.owners:
+            yield owner if owner > 0 else None if owner == NO_OWNER else BUDDY
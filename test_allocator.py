@@ -0,0 +1,110 @@
+import random
+import unittest
+
+from allocator import ALGORITHMS, Allocator
+from tables import BUDDY_OWNER, NO_OWNER
+
+
+def check_invariants(test, allocator):
+    # Everything the allocator keeps alongside the block columns must agree
+    # with the columns themselves
+    n = len(allocator.memory_blocks)
+    blocks, original, owners = allocator.memory_blocks, allocator.original_memory, allocator.owners
+    test.assertEqual(len(original), n)
+    test.assertEqual(len(owners), n)
+    test.assertEqual(allocator.total_units, sum(original))
+    test.assertEqual(allocator.free_units, sum(blocks[i] for i in range(n) if owners[i] <= NO_OWNER))
+    test.assertEqual(set(allocator.buddy_arenas), {i for i in range(n) if owners[i] == BUDDY_OWNER})
+
+    held = {}
+    for i in range(n):
+        if owners[i] > 0:
+            held[owners[i]] = i
+            test.assertEqual(blocks[i], original[i] - allocator.get_process(owners[i]).size)
+        elif owners[i] == BUDDY_OWNER:
+            arena = allocator.buddy_arenas[i]
+            test.assertTrue(arena.allocations)
+            test.assertEqual(arena.capacity, original[i])
+            test.assertEqual(blocks[i], arena.free_memory())
+            held.update((process_id, i) for process_id in arena.allocations)
+        else:
+            test.assertEqual(blocks[i], original[i])
+    test.assertEqual(allocator.process_blocks, held)
+    test.assertEqual(set(allocator.process_rows), set(held))
+    test.assertTrue(0 <= allocator.next_fit_position < max(n, 1))
+
+    if allocator.indexed:
+        test.assertEqual(list(allocator.free_index), sorted((blocks[i], i) for i in range(n) if owners[i] == NO_OWNER))
+        for tree, leaves in ((allocator.first_fit_tree, [blocks[i] if owners[i] == NO_OWNER else -1 for i in range(n)]),
+                             (allocator.buddy_tree, [allocator.buddy_arenas[i].largest_free()
+                                                     if owners[i] == BUDDY_OWNER else -1 for i in range(n)])):
+            test.assertEqual(tree.n, n)
+            test.assertEqual(tree.tree[tree.size:tree.size+n], leaves)
+            test.assertTrue(all(value == -1 for value in tree.tree[tree.size+n:]))
+            for i in range(1, tree.size):
+                test.assertEqual(tree.tree[i], max(tree.tree[2*i], tree.tree[2*i+1]))
+
+
+def state(allocator):
+    return (list(allocator.memory_blocks), list(allocator.original_memory), list(allocator.owners),
+            dict(allocator.process_blocks), allocator.next_fit_position, allocator.statistics())
+
+
+class IndexedAllocatorTest(unittest.TestCase):
+    # The indexed allocator (sorted free index, segment trees) must make
+    # exactly the choices of the plain linear scans
+    def run_random(self, seed, algorithms, operations=600, blocks=60):
+        rng = random.Random(seed)
+        sizes = [rng.randint(1, 1000) for _ in range(blocks)]
+        indexed, linear = Allocator(sizes), Allocator(sizes, indexed=False)
+        for step in range(operations):
+            roll = rng.random()
+            if roll < 0.55:
+                size, priority, algorithm = rng.randint(1, 700), rng.randint(1, 10), rng.choice(algorithms)
+                result = indexed.allocate(size, priority, algorithm)
+                self.assertEqual(result, linear.allocate(size, priority, algorithm), (seed, step, algorithm, size))
+            elif roll < 0.9 and indexed.process_rows:
+                process_id = rng.choice(sorted(indexed.process_rows))
+                self.assertEqual(indexed.deallocate(process_id), linear.deallocate(process_id))
+            elif roll < 0.97:
+                size = rng.randint(1, 1500)
+                self.assertEqual(indexed.defragment(size), linear.defragment(size), (seed, step, size))
+            else:
+                self.assertEqual(indexed.defragment(), linear.defragment(), (seed, step))
+            self.assertEqual(state(indexed), state(linear), (seed, step))
+            check_invariants(self, indexed)
+            check_invariants(self, linear)
+
+    def test_each_algorithm(self):
+        for algorithm in ALGORITHMS:
+            for seed in range(5):
+                with self.subTest(algorithm=algorithm, seed=seed):
+                    self.run_random(seed, [algorithm])
+
+    def test_mixed_algorithms(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.run_random(seed, ALGORITHMS)
+
+    def test_partial_defragment_leaves_rest_in_place(self):
+        allocator = Allocator([100, 80, 100, 80, 100, 50])
+        for size in (100, 100, 100):
+            allocator.allocate(size)
+        self.assertEqual(allocator.defragment(120), {"Moved": 100, "Relocations": 1, "Satisfied": True})
+        self.assertEqual(list(allocator.memory_blocks), [0, 0, 160, 0, 50])
+        self.assertEqual(list(allocator.processes), [1, 2, None, 3, None])
+        check_invariants(self, allocator)
+
+    def test_full_defragment(self):
+        allocator = Allocator([100, 50, 100, 50, 100, 50])
+        for size in (100, 100, 100):
+            allocator.allocate(size)
+        allocator.deallocate(2)
+        self.assertEqual(allocator.defragment(), {"Moved": 100, "Relocations": 1, "Satisfied": True})
+        self.assertEqual(list(allocator.memory_blocks), [0, 0, 250])
+        self.assertEqual(allocator.block_of(3), 1)
+        check_invariants(self, allocator)
+
+
+if __name__ == "__main__":
+    unittest.main()
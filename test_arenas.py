@@ -0,0 +1,35 @@
+import random
+import sys
+import unittest
+
+from arenas import ConcurrentAllocator, check, run_threads
+
+
+class ConcurrentAllocatorTest(unittest.TestCase):
+    def test_threads_leave_arenas_consistent(self):
+        # Switch threads far more often than usual so races show up
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        rng = random.Random(0)
+        blocks = [rng.randint(100, 1000) for _ in range(64)]
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                allocator = ConcurrentAllocator(blocks, 4)
+                owned, _ = run_threads(allocator, 8, 300, seed * 1000)
+                self.assertEqual(check(allocator, owned), [])
+                for process_ids in owned:
+                    for process_id in process_ids:
+                        self.assertTrue(allocator.deallocate(process_id))
+                stats = allocator.statistics()
+                self.assertEqual((stats["Used"], stats["Processes"]), (0, 0))
+
+    def test_empty_block_list_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ConcurrentAllocator([])
+        with self.assertRaises(ValueError):
+            ConcurrentAllocator([100], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import random
+import tempfile
+import unittest
+
+from allocator import Allocator, ProcessTable
+from journal import Journal
+
+
+def table_state(table, start_times=True):
+    processes = [proc.as_dict() for proc in table.process_list]
+    if not start_times:
+        for proc in processes:
+            del proc["StartTime"]
+    return processes, table.arrival_numbers(), table.next_process_id, table.arrivals
+
+
+def random_operation(rng, table):
+    # One random table change; priorities are few so many of them tie
+    roll = rng.random()
+    process_ids = sorted(table.process_rows)
+    if roll < 0.4 or not process_ids:
+        table.add_process(rng.randint(1, 500), rng.randint(1, 3), rng.choice([None, "a", "b"]))
+    elif roll < 0.6:
+        table.remove_process(rng.choice(process_ids))
+        table.notify("processes")
+    elif roll < 0.7:
+        table.set_priority(rng.choice(process_ids), rng.randint(1, 3))
+    elif roll < 0.8:
+        table.set_status(rng.choice(process_ids), rng.choice(["Running", "Suspended"]))
+    elif roll < 0.9:
+        table.rename(rng.choice(process_ids), rng.choice(["a", "b", "c"]))
+    else:
+        table.age()
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "state")
+
+    def open_journal(self, table=None, **kwargs):
+        table = table if table is not None else ProcessTable()
+        journal = Journal(table, self.path, **kwargs)
+        journal.load()
+        self.addCleanup(journal.close)
+        return table, journal
+
+    def test_reload_matches_original(self):
+        # Snapshots are taken often, so reloads start from a snapshot and
+        # replay the journal after it
+        rng = random.Random(0)
+        table, journal = self.open_journal(snapshot_every=50)
+        for step in range(2000):
+            random_operation(rng, table)
+            if step % 250 == 249:
+                journal.close()
+                reloaded, journal = self.open_journal(snapshot_every=50)
+                self.assertEqual(table_state(reloaded), table_state(table), step)
+                # Both must also go on to make the same choices (new
+                # processes get different start times, though)
+                for _ in range(20):
+                    state = rng.getstate()
+                    random_operation(rng, table)
+                    rng.setstate(state)
+                    random_operation(rng, reloaded)
+                self.assertEqual(table_state(reloaded, False), table_state(table, False), step)
+                table = reloaded
+
+    def test_equal_priorities_keep_arrival_order(self):
+        table, journal = self.open_journal()
+        # The snapshot lists second first, but first arrived earlier
+        first = table.add_process(100, 1)
+        second = table.add_process(100, 5)
+        journal.snapshot()
+        journal.close()
+
+        reloaded, _ = self.open_journal()
+        for t in (table, reloaded):
+            t.set_priority(first, 5)
+        self.assertEqual(reloaded.process_column("ID"), [first, second])
+        self.assertEqual(table.process_column("ID"), [first, second])
+
+    def test_torn_last_record_is_dropped(self):
+        table, journal = self.open_journal()
+        table.add_process(100, 1)
+        table.add_process(200, 2)
+        journal.close()
+        with open(self.path + ".journal", "ab") as f:
+            f.write(b'[3, "add", 3, 50, 1, "Runn')
+
+        reloaded, journal = self.open_journal()
+        self.assertEqual(table_state(reloaded), table_state(table))
+        reloaded.add_process(300, 3)
+        journal.close()
+        with open(self.path + ".journal", "rb") as f:
+            self.assertTrue(all(line.endswith(b"\n") for line in f))
+        again, _ = self.open_journal()
+        self.assertEqual(table_state(again), table_state(reloaded))
+
+    def test_crash_between_snapshot_and_truncation(self):
+        table, journal = self.open_journal()
+        for size in (100, 200, 300):
+            table.add_process(size, 1)
+        table.remove_process(2)
+        journal.sync()
+        with open(self.path + ".journal", "rb") as f:
+            records = f.read()
+        journal.snapshot()
+        journal.close()
+        # The snapshot was written but the journal it covers is still there
+        with open(self.path + ".journal", "wb") as f:
+            f.write(records)
+
+        reloaded, _ = self.open_journal()
+        self.assertEqual(table_state(reloaded), table_state(table))
+
+    def test_next_id_continues_after_reload(self):
+        allocator, journal = self.open_journal(Allocator([500] * 4))
+        for size in (100, 100, 100):
+            allocator.allocate(size)
+        allocator.deallocate(3)
+        journal.snapshot()
+        journal.close()
+
+        reloaded, _ = self.open_journal(Allocator([500] * 4))
+        self.assertEqual(reloaded.allocate(100), 4)
+        self.assertEqual(sorted(reloaded.process_rows), [1, 2, 4])
+        self.assertEqual(len(reloaded.ids), 3)
+
+    def test_duplicate_id_leaves_table_unchanged(self):
+        table = ProcessTable()
+        table.add_process(100, 1, process_id=1)
+        with self.assertRaises(ValueError):
+            table.add_row(1, 50, 1, 0, 0.0)
+        with self.assertRaises(OverflowError):
+            table.add_process(50, 10**30)
+        self.assertEqual(list(table.ids), [1])
+        self.assertEqual(table.process_rows, {1: 0})
+        self.assertEqual(table.add_process(50, 1), 2)
+
+    def test_plain_process_list_still_loads(self):
+        with open(self.path + ".json", "w") as f:
+            f.write('[{"ID": 7, "Size": 100, "Priority": 2, "Status": "Running", "StartTime": 0.0}]')
+        table, _ = self.open_journal()
+        self.assertEqual(table.process_column("ID"), [7])
+        self.assertEqual(table.add_process(10, 1), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
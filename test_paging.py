@@ -0,0 +1,84 @@
+import unittest
+
+from paging import REPLACEMENT_POLICIES, AgingReplacement, PagedMemory
+
+
+def run_references(replacement, frames, references, interval=None):
+    # One process of one-page units, no TLB, so every access reaches the policy
+    memory = PagedMemory(frames, page_size=1, tlb_size=0, replacement=replacement)
+    if interval is not None:
+        memory.policy = AgingReplacement(frames, interval)
+    process_id = memory.allocate(max(references) + 1)
+    for page in references:
+        memory.access(process_id, page)
+    return memory
+
+
+class ReplacementTest(unittest.TestCase):
+    BELADY = [1, 2, 3, 4, 1, 2, 5, 1, 2, 3, 4, 5]
+    # 2 is used again after 4 comes in, so only FIFO evicts it for 5
+    SECOND_CHANCE = [1, 2, 3, 4, 2, 5, 2, 1]
+
+    def test_fifo_shows_beladys_anomaly(self):
+        self.assertEqual(run_references("FIFO", 3, self.BELADY).counts["Page Faults"], 9)
+        self.assertEqual(run_references("FIFO", 4, self.BELADY).counts["Page Faults"], 10)
+
+    def test_lru(self):
+        self.assertEqual(run_references("LRU", 3, self.BELADY).counts["Page Faults"], 10)
+        self.assertEqual(run_references("LRU", 4, self.BELADY).counts["Page Faults"], 8)
+
+    def test_recently_used_page_is_kept(self):
+        cases = [("FIFO", None, 7), ("LRU", None, 6), ("CLOCK", None, 6), ("Aging", 1, 6)]
+        for replacement, interval, faults in cases:
+            with self.subTest(replacement=replacement):
+                memory = run_references(replacement, 3, self.SECOND_CHANCE, interval)
+                self.assertEqual(memory.counts["Page Faults"], faults)
+                self.assertEqual(memory.counts["Evictions"], faults - 3)
+                self.assertEqual(memory.resident_pages(1), 3)
+
+    def test_every_policy_frees_frames_on_deallocate(self):
+        for replacement in REPLACEMENT_POLICIES:
+            with self.subTest(replacement=replacement):
+                memory = run_references(replacement, 3, self.BELADY)
+                memory.deallocate(1)
+                self.assertEqual(memory.free_memory(), 3)
+                evictions = memory.counts["Evictions"]
+                second = memory.allocate(3)
+                self.assertEqual(sorted(memory.access(second, page) for page in range(3)), [0, 1, 2])
+                self.assertEqual(memory.counts["Evictions"], evictions)
+
+
+class TLBTest(unittest.TestCase):
+    def test_hits_and_lru_order(self):
+        memory = PagedMemory(4, page_size=1, tlb_size=2)
+        process_id = memory.allocate(3)
+        for page in (0, 1, 0, 2, 0, 1):
+            memory.access(process_id, page)
+        # 2 pushed out 1, the least recently used entry, and 0 stayed
+        self.assertEqual(memory.counts, {"Accesses": 6, "TLB Hits": 2, "Page Faults": 3, "Evictions": 0})
+
+    def test_eviction_drops_tlb_entry(self):
+        memory = PagedMemory(1, page_size=1, replacement="FIFO")
+        first, second = memory.allocate(1), memory.allocate(1)
+        for process_id in (first, second, first):
+            memory.access(process_id, 0)
+        self.assertEqual(memory.counts["TLB Hits"], 0)
+        self.assertEqual(memory.counts["Page Faults"], 3)
+
+    def test_pages_outside_the_process_are_rejected(self):
+        memory = PagedMemory(1, page_size=1, replacement="FIFO")
+        first, second = memory.allocate(1), memory.allocate(1)
+        memory.access(first, 0)
+        memory.access(second, 0)  # Takes the only frame from first
+        for process_id, page in ((first, -1), (first, 1), (second, -1), (3, 0)):
+            with self.subTest(process_id=process_id, page=page):
+                with self.assertRaises(ValueError):
+                    memory.access(process_id, page)
+        with self.assertRaises(ValueError):
+            memory.translate(first, -1)
+        self.assertEqual(memory.access(first, 0), 0)
+        self.assertEqual(memory.counts["Page Faults"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import random
+import time
+from collections import namedtuple
+
+# One line per event, fields separated by whitespace:
+#
+#   <time> alloc <process id> <size KB> [priority]
+#   <time> free <process id>
+#   <time> suspend <process id>
+#   <time> resume <process id>
+#
+# Times are seconds from the start of the trace and must not decrease.
+# Blank lines and lines starting with # are ignored.
+TraceEvent = namedtuple("TraceEvent", "time op process_id size priority")
+
+OPERATIONS = ("alloc", "free", "suspend", "resume")
+SIZE_DISTRIBUTIONS = ("uniform", "exponential", "bimodal")
+
+
+def parse_event(line):
+    fields = line.split()
+    op = fields[1]
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown trace operation: {op}")
+    if op == "alloc":
+        priority = int(fields[4]) if len(fields) > 4 else 1
+        return TraceEvent(float(fields[0]), op, int(fields[2]), int(fields[3]), priority)
+    return TraceEvent(float(fields[0]), op, int(fields[2]), 0, 0)
+
+
+def format_event(event):
+    if event.op == "alloc":
+        return f"{event.time:.6f} alloc {event.process_id} {event.size} {event.priority}"
+    return f"{event.time:.6f} {event.op} {event.process_id}"
+
+
+def read_trace(path):
+    # Streams events from a trace file one line at a time
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield parse_event(line)
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"{path}:{line_number}: bad trace line: {line!r}") from e
+
+
+def write_trace(path, events):
+    count = 0
+    with open(path, "w") as f:
+        for event in events:
+            f.write(format_event(event) + "\n")
+            count += 1
+    return count
+
+
+def random_size(rng, distribution, max_size):
+    if distribution == "uniform":
+        return rng.randint(1, max_size)
+    elif distribution == "exponential":
+        # Mostly small requests with a long tail
+        return min(max_size, 1 + int(rng.expovariate(8 / max_size)))
+    elif distribution == "bimodal":
+        # Many small requests and a few close to max_size
+        if rng.random() < 0.8:
+            return rng.randint(1, max(1, max_size // 10))
+        return rng.randint(max(1, max_size // 2), max_size)
+    raise ValueError(f"Unknown size distribution: {distribution}")
+
+
+def generate_events(count, seed=0, size_distribution="uniform", max_size=500,
+                    arrival_rate=1000.0, free_probability=0.45, suspend_probability=0.05):
+    # Synthetic workload: Poisson arrivals, sizes from the chosen
+    # distribution, and frees, suspends and resumes of random live processes
+    rng = random.Random(seed)
+    live = []
+    suspended = set()
+    next_id = 1
+    now = 0.0
+    for _ in range(count):
+        now += rng.expovariate(arrival_rate)
+        roll = rng.random()
+        if live and roll < free_probability:
+            process_id = live.pop(rng.randrange(len(live)))
+            suspended.discard(process_id)
+            yield TraceEvent(now, "free", process_id, 0, 0)
+        elif live and roll < free_probability + suspend_probability:
+            process_id = live[rng.randrange(len(live))]
+            if process_id in suspended:
+                suspended.discard(process_id)
+                yield TraceEvent(now, "resume", process_id, 0, 0)
+            else:
+                suspended.add(process_id)
+                yield TraceEvent(now, "suspend", process_id, 0, 0)
+        else:
+            live.append(next_id)
+            yield TraceEvent(now, "alloc", next_id, random_size(rng, size_distribution, max_size), rng.randint(1, 10))
+            next_id += 1
+
+
+def new_interval(start):
+    return {"Start": start, "Events": 0, "Allocations": 0, "Failures": 0,
+            "Frees": 0, "Suspends": 0, "Resumes": 0, "Skipped": 0}
+
+
+def finish_interval(counts, end, allocator, elapsed):
+    stats = allocator.statistics()
+    counts["End"] = end
+    counts["Success Rate"] = 1 - counts["Failures"] / counts["Allocations"] if counts["Allocations"] else 1.0
+    counts["Free"] = stats["Free"]
+    counts["Used"] = stats["Used"]
+    counts["Largest Free"] = stats["Largest Free"]
+    counts["External Fragmentation"] = stats["External Fragmentation"]
+    counts["Ops/s"] = counts["Events"] / elapsed if elapsed > 0 else float("inf")
+    return counts
+
+
+def replay(events, allocator, algorithm="First Fit", interval=1.0):
+    # Feeds events into an allocator (Allocator or VariablePartitionAllocator)
+    # and yields one metrics dict per interval of trace time, plus one for
+    # the final partial interval. Only the current event is held in memory.
+    #
+    # A process whose allocation failed is remembered as missing so its
+    # later events are counted as skipped rather than as errors.
+    missing = set()
+    window_start = None
+    counts = None
+    wall_start = time.perf_counter()
+
+    for event in events:
+        if window_start is None:
+            window_start = event.time
+            counts = new_interval(window_start)
+        while event.time >= window_start + interval:
+            yield finish_interval(counts, window_start + interval, allocator, time.perf_counter() - wall_start)
+            wall_start = time.perf_counter()  # Time spent by the consumer is not ours
+            window_start += interval
+            counts = new_interval(window_start)
+
+        counts["Events"] += 1
+        op = event.op
+        if op == "alloc":
+            counts["Allocations"] += 1
+            missing.discard(event.process_id)
+            if allocator.allocate(event.size, event.priority, algorithm, process_id=event.process_id) is None:
+                counts["Failures"] += 1
+                missing.add(event.process_id)
+        elif event.process_id in missing:
+            counts["Skipped"] += 1
+            if op == "free":
+                missing.discard(event.process_id)
+        elif op == "free":
+            counts["Frees"] += 1
+            allocator.deallocate(event.process_id)
+        elif op == "suspend":
+            counts["Suspends"] += 1
+            allocator.suspend(event.process_id)
+        elif op == "resume":
+            counts["Resumes"] += 1
+            allocator.resume(event.process_id)
+
+    if counts is not None and counts["Events"]:
+        yield finish_interval(counts, window_start + interval, allocator, time.perf_counter() - wall_start)